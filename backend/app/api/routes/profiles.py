@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+from typing import Dict, List, Optional
+
+from app.core.profiling import authorized, profile_store
+
+router = APIRouter(prefix="/debug/profiles", tags=["profiling"])
+
+
+def require_admin(x_profile_token: Optional[str] = Header(None)) -> None:
+    """Only the holder of PROFILING_ADMIN_TOKEN may read profiles"""
+    if not authorized(x_profile_token):
+        raise HTTPException(status_code=403, detail="X-Profile-Token required")
+
+
+@router.get("", response_model=List[Dict[str, object]], dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """
+    Stored request profiles, newest first
+    """
+    return profile_store.list()
+
+
+@router.get("/{profile_id}", dependencies=[Depends(require_admin)])
+async def download_profile(profile_id: str):
+    """
+    Download a profile (the X-Profile-Id of the request or an ID from the list)
+    as a speedscope file, viewable as a flamegraph at https://www.speedscope.app
+    """
+    path = profile_store.find(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=path.rsplit("/", 1)[-1])
@@ -1,103 +1,188 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
-from typing import List, Optional
-from datetime import datetime, timedelta
-
-from app.db import get_db
+from typing import List, Optional, Union
+from datetime import date, datetime, timezone
+from email.utils import format_datetime
+import gzip
+
+from app.core.cache import (
+    REVIEWS,
+    REVIEWS_UNSCOPED,
+    STATS,
+    conditional_response,
+    make_etag,
+    property_namespace,
+    response_cache,
+)
+from app.core.config import settings
+from app.db import get_db, get_read_db
 from app.schemas.review import (
     ReviewResponse,
-    ReviewNormalized,
+    ReviewSearchResponse,
     ReviewUpdate,
+    BulkReviewUpdate,
+    BulkUpdateResponse,
     DashboardStats,
-    PropertyStats,
+    CategoryAnalytics,
+    SyncJobStatus,
+    TimeseriesResponse,
+    PublicReviewFeed,
+)
+from app.services.moderation import ModerationService
+from app.services.public_feed import PublicFeedService, compress
+from app.services.snapshot import hostaway_snapshot
+from app.services.daily_stats import DailyStatsService
+from app.services.stats import StatsService
+from app.services.sync_jobs import sync_jobs
+from app.services.review_search import ReviewSearch
+from app.services.review_queries import review_filters, newest_first, by_rating
+from app.services.review_serializer import dump_review_response, select_listing_rows
+from app.services.pagination import (
+    InvalidCursorError,
+    after_cursor,
+    encode_cursor,
 )
-from app.services.hostaway import HostawayService
 from app.models.review import Review
 
 router = APIRouter(prefix="/api/reviews", tags=["reviews"])
 
 
 @router.get("/hostaway", response_model=ReviewResponse)
-async def get_hostaway_reviews():
+async def get_hostaway_reviews(request: Request):
     """
     Fetch and normalize reviews from Hostaway API.
     This endpoint is required for the assessment and returns structured, usable data.
-    """
-    service = HostawayService()
-    reviews = await service.fetch_and_normalize_reviews()
 
-    return ReviewResponse(status="success", total=len(reviews), data=reviews)
+    Served from the last snapshot; stale snapshots are refreshed in the background.
+    """
+    snapshot = await hostaway_snapshot.get()
+
+    return conditional_response(
+        request,
+        snapshot.body,
+        make_etag(snapshot.body),
+        {
+            "X-Snapshot-Age": str(int(snapshot.age)),
+            "X-Snapshot-Fetched-At": datetime.utcfromtimestamp(snapshot.fetched_at).isoformat()
+            + "Z",
+        },
+    )
 
 
-@router.get("/", response_model=ReviewResponse)
+@router.get("/", response_model=Union[ReviewResponse, ReviewSearchResponse])
 async def get_reviews(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     property_id: Optional[str] = Query(None, description="Filter by property ID"),
     channel: Optional[str] = Query(None, description="Filter by channel"),
-    min_rating: Optional[float] = Query(None, description="Minimum rating"),
+    min_rating: Optional[float] = Query(
+        None, description="Minimum rating (overall, or category average without one)"
+    ),
     is_approved: Optional[bool] = Query(None, description="Filter by approval status"),
+    q: Optional[str] = Query(
+        None, min_length=1, description="Full-text search of public_review (adds rank and snippet)"
+    ),
+    sort: Optional[str] = Query(
+        None,
+        pattern="^(newest|rating_desc|rating_asc|relevance)$",
+        description="newest first (default), by rating or by search relevance (default with q); "
+        "offset pagination only except for newest",
+    ),
     limit: int = Query(100, le=500),
     offset: int = Query(0),
+    pagination: str = Query(
+        "offset",
+        pattern="^(offset|cursor)$",
+        description="offset (limit/offset) or cursor (keyset, returns next_cursor)",
+    ),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(
+        False, description="Return the total number of matching reviews (extra COUNT query)"
+    ),
 ):
     """
-    Get reviews from database with filtering and pagination
+    Get reviews from database with filtering and pagination.
+    With `q`, only reviews matching the search are returned, each with a rank and snippet.
     """
-    query = select(Review)
+    async def build() -> bytes:
+        order = sort or ("relevance" if q else "newest")
+        use_cursor = pagination == "cursor" or cursor is not None
+        if use_cursor and order != "newest":
+            raise HTTPException(
+                status_code=400, detail="Cursor pagination requires sort=newest"
+            )
+        if order == "relevance" and not q:
+            raise HTTPException(status_code=400, detail="sort=relevance requires q")
+        query = select_listing_rows()
+
+        # Apply filters
+        filters = review_filters(property_id, channel, min_rating, is_approved)
+        search = ReviewSearch(q, db.bind.dialect.name) if q else None
+
+        if filters:
+            query = query.where(and_(*filters))
+        if search:
+            query = search.apply(query).add_columns(*search.columns())
+
+        total = None
+        if include_total:
+            count_query = select(func.count(Review.id))
+            if filters:
+                count_query = count_query.where(and_(*filters))
+            if search:
+                count_query = search.apply(count_query)
+            total = await db.scalar(count_query)
+
+        # Apply ordering and pagination
+        if order == "newest":
+            query = newest_first(query)
+        elif order == "relevance":
+            query = search.by_relevance(query)
+        else:
+            query = by_rating(query, descending=order == "rating_desc")
+        if use_cursor:
+            if cursor:
+                try:
+                    query = query.where(after_cursor(cursor))
+                except InvalidCursorError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+            # Fetch one extra row to know whether another page exists
+            query = query.limit(limit + 1)
+        else:
+            query = query.offset(offset).limit(limit)
 
-    # Apply filters
-    filters = []
-    if property_id:
-        filters.append(Review.property_id == property_id)
-    if channel:
-        filters.append(Review.channel == channel)
-    if min_rating is not None:
-        filters.append(Review.rating >= min_rating)
-    if is_approved is not None:
-        filters.append(Review.is_approved == is_approved)
+        result = await db.execute(query)
+        rows = result.all()
 
-    if filters:
-        query = query.where(and_(*filters))
+        next_cursor = None
+        if use_cursor and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].submitted_at, rows[-1].id)
 
-    # Apply pagination
-    query = query.offset(offset).limit(limit).order_by(Review.submitted_at.desc())
+        # Column rows straight to JSON bytes, no ORM objects or pydantic models
+        return dump_review_response(rows, total, next_cursor)
+
+    namespaces = [REVIEWS, property_namespace(property_id) if property_id else REVIEWS_UNSCOPED]
+    return await response_cache.respond(request, namespaces, build)
 
-    result = await db.execute(query)
-    reviews = result.scalars().all()
-
-    # Convert to response format
-    normalized_reviews = []
-    for review in reviews:
-        categories = review.review_categories or []
-        avg_rating = review.rating
-        if avg_rating is None and categories:
-            avg_rating = sum(cat["rating"] for cat in categories) / len(categories)
-
-        normalized_reviews.append(
-            ReviewNormalized(
-                id=str(review.external_id),
-                listing_id=review.listing_id,
-                listing_name=review.listing_name,
-                property_id=review.property_id,
-                review_type=review.review_type,
-                status=review.status,
-                rating=review.rating,
-                average_rating=avg_rating,
-                public_review=review.public_review,
-                review_categories=[
-                    {"category": cat["category"], "rating": cat["rating"]}
-                    for cat in categories
-                ],
-                guest_name=review.guest_name,
-                channel=review.channel,
-                submitted_at=review.submitted_at,
-                is_approved=review.is_approved,
-                is_featured=review.is_featured,
-            )
-        )
 
-    return ReviewResponse(
-        status="success", total=len(normalized_reviews), data=normalized_reviews
+@router.post("/moderation", response_model=BulkUpdateResponse)
+async def bulk_update_reviews(update_data: BulkReviewUpdate, db: AsyncSession = Depends(get_db)):
+    """
+    Approve/feature many reviews at once, by external ID or by filter,
+    in a single transaction. Returns the outcome for each review.
+    """
+    values = update_data.model_dump(include={"is_approved", "is_featured"}, exclude_none=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="Set is_approved and/or is_featured")
+    if (update_data.ids is None) == (update_data.filter is None):
+        raise HTTPException(status_code=400, detail="Provide either ids or filter")
+    if update_data.filter is not None and not update_data.filter.model_dump(exclude_none=True):
+        raise HTTPException(status_code=400, detail="filter must set at least one field")
+
+    return await ModerationService(db).bulk_update(
+        values, ids=update_data.ids, review_filter=update_data.filter
     )
 
 
@@ -115,149 +200,163 @@ async def update_review(
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
 
+    was_approved, was_featured = bool(review.is_approved), bool(review.is_featured)
+
     # Update fields
     if update_data.is_approved is not None:
         review.is_approved = update_data.is_approved
     if update_data.is_featured is not None:
         review.is_featured = update_data.is_featured
 
+    # Keep the property rollup and public feed in step within the same transaction
+    await StatsService(db).apply_moderation(
+        review.property_id,
+        int(bool(review.is_approved)) - int(was_approved),
+        int(bool(review.is_featured)) - int(was_featured),
+    )
+    if (bool(review.is_approved), bool(review.is_featured)) != (was_approved, was_featured):
+        await db.flush()  # the feed is rendered from the updated row
+        await PublicFeedService(db).regenerate([review.property_id])
+
     await db.commit()
+    await response_cache.invalidate(
+        REVIEWS_UNSCOPED, property_namespace(review.property_id), STATS
+    )
 
     return {"status": "success", "message": "Review updated successfully"}
 
 
 @router.get("/stats/dashboard", response_model=DashboardStats)
-async def get_dashboard_stats(db: AsyncSession = Depends(get_db)):
+async def get_dashboard_stats(request: Request, db: AsyncSession = Depends(get_read_db)):
     """
     Get overall dashboard statistics
     """
-    # Get total reviews
-    total_query = select(func.count(Review.id))
-    total_result = await db.execute(total_query)
-    total_reviews = total_result.scalar() or 0
-
-    # Get unique properties
-    properties_query = select(Review.property_id, Review.listing_name).distinct()
-    properties_result = await db.execute(properties_query)
-    unique_properties = properties_result.all()
-
-    # Get average rating
-    avg_query = select(func.avg(Review.rating)).where(Review.rating.isnot(None))
-    avg_result = await db.execute(avg_query)
-    average_rating = avg_result.scalar() or 0.0
-
-    # Get stats per property
-    property_stats_list = []
-    for prop_id, listing_name in unique_properties:
-        prop_query = select(Review).where(Review.property_id == prop_id)
-        prop_result = await db.execute(prop_query)
-        prop_reviews = prop_result.scalars().all()
-
-        if not prop_reviews:
-            continue
-
-        # Calculate average rating for property
-        ratings = [r.rating for r in prop_reviews if r.rating is not None]
-        prop_avg_rating = sum(ratings) / len(ratings) if ratings else 0.0
-
-        # Calculate category breakdown
-        category_totals = {}
-        category_counts = {}
-        for review in prop_reviews:
-            for cat in review.review_categories or []:
-                cat_name = cat["category"]
-                cat_rating = cat["rating"]
-                category_totals[cat_name] = category_totals.get(cat_name, 0) + cat_rating
-                category_counts[cat_name] = category_counts.get(cat_name, 0) + 1
-
-        ratings_breakdown = {
-            cat: category_totals[cat] / category_counts[cat]
-            for cat in category_totals
-        }
-
-        # Determine trend (simple: last 3 vs previous 3)
-        recent_trend = "stable"
-        if len(prop_reviews) >= 6:
-            recent_reviews = sorted(
-                prop_reviews, key=lambda x: x.submitted_at, reverse=True
-            )
-            recent_ratings = [
-                r.rating for r in recent_reviews[:3] if r.rating is not None
-            ]
-            older_ratings = [
-                r.rating for r in recent_reviews[3:6] if r.rating is not None
-            ]
-
-            if recent_ratings and older_ratings:
-                recent_avg = sum(recent_ratings) / len(recent_ratings)
-                older_avg = sum(older_ratings) / len(older_ratings)
-
-                if recent_avg > older_avg + 0.5:
-                    recent_trend = "improving"
-                elif recent_avg < older_avg - 0.5:
-                    recent_trend = "declining"
-
-        property_stats_list.append(
-            PropertyStats(
-                property_id=prop_id,
-                listing_name=listing_name or prop_id,
-                total_reviews=len(prop_reviews),
-                average_rating=round(prop_avg_rating, 2),
-                ratings_breakdown=ratings_breakdown,
-                recent_trend=recent_trend,
-                approved_count=sum(1 for r in prop_reviews if r.is_approved),
-                featured_count=sum(1 for r in prop_reviews if r.is_featured),
-            )
-        )
+    service = StatsService(db)
+    return await response_cache.respond(request, [STATS], service.get_dashboard_stats)
 
-    return DashboardStats(
-        total_reviews=total_reviews,
-        total_properties=len(unique_properties),
-        average_rating=round(average_rating, 2),
-        properties=property_stats_list,
+
+@router.get("/stats/categories", response_model=CategoryAnalytics)
+async def get_category_analytics(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    property_id: Optional[str] = Query(None, description="Limit to one property"),
+):
+    """
+    Category rating averages, distributions and weakest category per property
+    """
+    service = StatsService(db)
+    return await response_cache.respond(
+        request, [STATS], lambda: service.get_category_analytics(property_id)
     )
 
 
-@router.post("/sync")
-async def sync_reviews_from_hostaway(db: AsyncSession = Depends(get_db)):
+@router.get("/stats/timeseries", response_model=TimeseriesResponse)
+async def get_timeseries(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    interval: str = Query("week", pattern="^(day|week|month)$"),
+    property_id: Optional[str] = Query(None, description="Filter by property ID"),
+    channel: Optional[str] = Query(None, description="Filter by channel"),
+    category: Optional[str] = Query(
+        None, description="Use this category's ratings instead of the overall rating"
+    ),
+    group_by: Optional[str] = Query(
+        None, pattern="^(property|channel|category)$", description="One series per value"
+    ),
+    start: Optional[date] = Query(None, description="First submission day (inclusive)"),
+    end: Optional[date] = Query(None, description="Last submission day (inclusive)"),
+):
     """
-    Sync reviews from Hostaway API to database
+    Review volume and average rating over time, from the daily rollups
     """
-    service = HostawayService()
-    reviews = await service.fetch_and_normalize_reviews()
+    service = DailyStatsService(db)
+    return await response_cache.respond(
+        request,
+        [STATS],
+        lambda: service.get_timeseries(
+            interval, property_id, channel, category, group_by, start, end
+        ),
+    )
 
-    synced_count = 0
-    for review_data in reviews:
-        # Check if review already exists
-        query = select(Review).where(Review.external_id == review_data.id)
-        result = await db.execute(query)
-        existing_review = result.scalar_one_or_none()
-
-        if not existing_review:
-            # Create new review
-            new_review = Review(
-                external_id=review_data.id,
-                listing_id=review_data.listing_id,
-                listing_name=review_data.listing_name,
-                property_id=review_data.property_id,
-                review_type=review_data.review_type,
-                status=review_data.status,
-                rating=review_data.rating,
-                public_review=review_data.public_review,
-                review_categories=[cat.dict() for cat in review_data.review_categories],
-                guest_name=review_data.guest_name,
-                channel=review_data.channel,
-                submitted_at=review_data.submitted_at,
-                is_approved=False,
-                is_featured=False,
-            )
-            db.add(new_review)
-            synced_count += 1
 
-    await db.commit()
+@router.get("/public/{property_id}", response_model=PublicReviewFeed)
+async def get_public_feed(
+    property_id: str, request: Request, db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Approved reviews of one property for the public site, featured first.
+    Served pre-rendered and gzip-compressed, with headers letting browsers and CDNs cache it.
+    """
+    service = PublicFeedService(db)
+    feed = await service.get(property_id)
+    if feed is not None:
+        compressed, etag, generated_at = feed.body, feed.etag, feed.generated_at
+    else:
+        # Not rendered yet (e.g. no review moderated since the property appeared). Stamped
+        # with the data's last change rather than now, so the ETag only moves with the data.
+        generated_at = await service.last_modified(property_id)
+        body = await service.render(property_id, generated_at) if generated_at else None
+        if body is None:
+            raise HTTPException(status_code=404, detail="Property not found")
+        compressed, etag = compress(body), make_etag(body)
+
+    headers = {
+        "Cache-Control": (
+            f"public, max-age={settings.PUBLIC_FEED_MAX_AGE_SECONDS}, "
+            f"s-maxage={settings.PUBLIC_FEED_CDN_MAX_AGE_SECONDS}, "
+            f"stale-while-revalidate={settings.PUBLIC_FEED_STALE_SECONDS}, "
+            f"stale-if-error={settings.PUBLIC_FEED_STALE_SECONDS}"
+        ),
+        "Vary": "Accept-Encoding",
+        "Last-Modified": format_datetime(generated_at.replace(tzinfo=timezone.utc), usegmt=True),
+    }
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        # Each encoding is a different representation, so it gets its own ETag
+        headers["Content-Encoding"] = "gzip"
+        return conditional_response(request, compressed, etag[:-1] + '-gzip"', headers)
+    return conditional_response(request, gzip.decompress(compressed), etag, headers)
+
+
+@router.post("/sync", status_code=202)
+async def sync_reviews_from_hostaway(
+    mode: str = Query(
+        "auto",
+        pattern="^(auto|incremental|full)$",
+        description="incremental (since last cursor), full (reconcile) or auto",
+    ),
+    update_existing: Optional[bool] = Query(
+        None, description="Update changed status/rating/text of existing reviews"
+    ),
+    account_id: Optional[str] = Query(
+        None, description="Sync one Hostaway account instead of all active accounts"
+    ),
+):
+    """
+    Queue a sync of reviews from Hostaway API to database.
+    Returns immediately; poll /sync/jobs/{job_id} for progress.
+    """
+    job = await sync_jobs.enqueue(
+        mode=mode, update_existing=update_existing, account_id=account_id
+    )
 
     return {
-        "status": "success",
-        "message": f"Synced {synced_count} new reviews from Hostaway",
-        "total_synced": synced_count,
+        "status": "queued",
+        "message": f"Sync job {job.id} queued",
+        "job_id": job.id,
+        "job": SyncJobStatus.model_validate(job),
     }
+
+
+@router.get("/sync/jobs", response_model=List[SyncJobStatus])
+async def list_sync_jobs(limit: int = Query(20, ge=1, le=100)):
+    """Recent sync jobs, newest first"""
+    return await sync_jobs.list_jobs(limit)
+
+
+@router.get("/sync/jobs/{job_id}", response_model=SyncJobStatus)
+async def get_sync_job(job_id: int):
+    """Status and progress of one sync job"""
+    job = await sync_jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return job
@@ -0,0 +1,156 @@
+"""
+Maintenance commands for the reviews backend.
+
+Usage:
+    python -m app.cli rebuild-stats
+    python -m app.cli check-stats
+    python -m app.cli check-plans
+    python -m app.cli rebuild-feeds
+    python -m app.cli sync-worker
+    python -m app.cli add-account ACCOUNT_ID API_KEY [--name NAME] [--rate-limit N]
+    python -m app.cli list-accounts
+"""
+import argparse
+import asyncio
+import sys
+
+from app.db import init_db
+from app.db.database import AsyncSessionLocal, dispose_engines, engine
+from app.db.query_plans import check_query_plans
+from app.services.accounts import AccountService
+from app.services.hostaway import open_http_client, close_http_client
+from app.services.public_feed import PublicFeedService
+from app.services.stats import StatsService
+from app.services.sync_jobs import sync_jobs
+
+
+async def rebuild_stats(args) -> int:
+    """Recompute the property_stats rollup table from reviews"""
+    async with AsyncSessionLocal() as session:
+        count = await StatsService(session).rebuild()
+    print(f"Rebuilt property stats for {count} properties")
+    return 0
+
+
+async def check_stats(args) -> int:
+    """Verify the property_stats rollup table matches the reviews table"""
+    async with AsyncSessionLocal() as session:
+        problems = await StatsService(session).check_consistency()
+
+    for problem in problems:
+        print(problem)
+    if problems:
+        print(f"Property stats inconsistent: {len(problems)} problem(s)")
+        return 1
+
+    print("Property stats consistent")
+    return 0
+
+
+async def check_plans(args) -> int:
+    """Verify the hot review queries use their composite indexes"""
+    async with engine.begin() as conn:
+        problems = await conn.run_sync(check_query_plans)
+        # Plans only; undo any session settings changed while explaining
+        await conn.rollback()
+
+    for problem in problems:
+        print(problem)
+    if problems:
+        print(f"Query plan regressions: {len(problems)}")
+        return 1
+
+    print(f"Query plans OK ({engine.dialect.name})")
+    return 0
+
+
+async def rebuild_feeds(args) -> int:
+    """Re-render the pre-rendered public review feed of every property"""
+    async with AsyncSessionLocal() as session:
+        count = await PublicFeedService(session).rebuild()
+    print(f"Rebuilt public feeds for {count} properties")
+    return 0
+
+
+async def sync_worker(args) -> int:
+    """Run queued and scheduled Hostaway syncs (set SYNC_WORKER_ENABLED=false on the API)"""
+    await open_http_client()
+    sync_jobs.start()
+    print("Sync worker started")
+    try:
+        await sync_jobs.wait()
+    finally:
+        await sync_jobs.stop()
+        await close_http_client()
+    return 0
+
+
+async def add_account(args) -> int:
+    """Register a Hostaway account to sync, or update its credentials"""
+    async with AsyncSessionLocal() as session:
+        account = await AccountService(session).save_account(
+            args.account_id,
+            args.api_key,
+            name=args.name,
+            rate_limit_per_second=args.rate_limit,
+            is_active=not args.inactive,
+        )
+    print(f"Saved Hostaway account {account.account_id}")
+    return 0
+
+
+async def list_accounts(args) -> int:
+    """List the Hostaway accounts synced by the worker"""
+    async with AsyncSessionLocal() as session:
+        accounts = await AccountService(session).list_accounts(active_only=False)
+
+    for account in accounts:
+        rate = account.rate_limit_per_second or "default"
+        state = "active" if account.is_active else "inactive"
+        print(f"{account.account_id}\t{account.name or ''}\t{state}\trate limit: {rate}")
+    return 0
+
+
+COMMANDS = {
+    "rebuild-stats": rebuild_stats,
+    "check-stats": check_stats,
+    "check-plans": check_plans,
+    "rebuild-feeds": rebuild_feeds,
+    "sync-worker": sync_worker,
+    "add-account": add_account,
+    "list-accounts": list_accounts,
+}
+
+
+async def run(args) -> int:
+    await init_db()
+    try:
+        return await COMMANDS[args.command](args)
+    finally:
+        await dispose_engines()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild-stats", help=rebuild_stats.__doc__)
+    subparsers.add_parser("check-stats", help=check_stats.__doc__)
+    subparsers.add_parser("check-plans", help=check_plans.__doc__)
+    subparsers.add_parser("rebuild-feeds", help=rebuild_feeds.__doc__)
+    subparsers.add_parser("sync-worker", help=sync_worker.__doc__)
+    account_parser = subparsers.add_parser("add-account", help=add_account.__doc__)
+    account_parser.add_argument("account_id")
+    account_parser.add_argument("api_key")
+    account_parser.add_argument("--name")
+    account_parser.add_argument(
+        "--rate-limit", type=float, help="Requests per second for this account"
+    )
+    account_parser.add_argument("--inactive", action="store_true", help="Register but do not sync")
+    subparsers.add_parser("list-accounts", help=list_accounts.__doc__)
+
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""
+Response cache for read endpoints.
+
+Entries are keyed by route + normalized query params + the current generation
+of every namespace the response depends on. Writes invalidate by bumping
+namespace generations, so stale entries are never read again and simply age
+out. The in-process LRU backend is the default; its generations live in the
+cache_generations table, so invalidations by other processes (API workers,
+`python -m app.cli sync-worker`) are seen within CACHE_GENERATION_REFRESH_SECONDS.
+A Redis-compatible backend can be selected with CACHE_BACKEND=redis, which
+shares both entries and generations between workers.
+
+With a read replica (DATABASE_READ_URL) a response built right after an
+invalidation may still reflect the replica's pre-write state. Responses are
+therefore not stored for CACHE_REPLICA_LAG_SECONDS after a generation change
+is first seen, so replica lag can't be cached for the full TTL.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.config import settings
+from app.models.cache_generation import CacheGeneration
+
+# Namespaces shared by the routes and the write paths
+REVIEWS = "reviews"  # Every review listing
+REVIEWS_UNSCOPED = "reviews:any"  # Listings not filtered by property
+STATS = "stats"  # Dashboard statistics
+
+
+def property_namespace(property_id: Optional[str]) -> str:
+    """Namespace for listings filtered to one property"""
+    return f"reviews:property:{property_id or ''}"
+
+
+class DatabaseGenerations:
+    """
+    Namespace generations stored in the database and shared by every process
+    using it. Reads come from a local copy refreshed at most every
+    `refresh_seconds`; this process's own invalidations apply immediately.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._generations: Dict[str, int] = {}
+        self._loaded_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _sessions():
+        # Imported late: the database module imports services that import this module
+        from app.db.database import AsyncSessionLocal
+
+        return AsyncSessionLocal()
+
+    async def get(self, names: List[str]) -> List[int]:
+        if time.monotonic() - self._loaded_at >= self.refresh_seconds:
+            async with self._lock:
+                # Concurrent requests share one refresh
+                if time.monotonic() - self._loaded_at >= self.refresh_seconds:
+                    await self._load()
+        return [self._generations.get(name, 0) for name in names]
+
+    async def _load(self) -> None:
+        async with self._sessions() as session:
+            result = await session.execute(
+                select(CacheGeneration.namespace, CacheGeneration.generation)
+            )
+            # Merged, not replaced: a load that read the table before a concurrent local
+            # incr committed must not roll that namespace back
+            for namespace, generation in result.all():
+                if generation > self._generations.get(namespace, 0):
+                    self._generations[namespace] = generation
+        self._loaded_at = time.monotonic()
+
+    async def incr(self, name: str) -> None:
+        async with self._sessions() as session:
+            dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+            stmt = dialect.insert(CacheGeneration).values(namespace=name, generation=1)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[CacheGeneration.namespace],
+                set_={"generation": CacheGeneration.generation + 1},
+            ).returning(CacheGeneration.generation)
+            generation = await session.scalar(stmt)
+            await session.commit()
+        self._generations[name] = max(self._generations.get(name, 0), generation)
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry TTL and database-backed generations"""
+
+    def __init__(self, max_entries: int, generations: DatabaseGenerations):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self.generations = generations
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_counters(self, names: List[str]) -> List[int]:
+        return await self.generations.get(names)
+
+    async def incr(self, name: str) -> None:
+        await self.generations.incr(name)
+
+    async def close(self) -> None:
+        self._entries.clear()
+
+
+class RedisCacheBackend:
+    """Redis-compatible backend shared by all workers (requires the redis package)"""
+
+    prefix = "flexliving:cache:"
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package") from e
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self._redis.set(self.prefix + key, value, ex=ttl)
+
+    async def get_counters(self, names: List[str]) -> List[int]:
+        values = await self._redis.mget([self.prefix + "gen:" + name for name in names])
+        return [int(value or 0) for value in values]
+
+    async def incr(self, name: str) -> None:
+        await self._redis.incr(self.prefix + "gen:" + name)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class ResponseCache:
+    """Caches serialized responses and answers conditional requests with 304"""
+
+    def __init__(self, backend, ttl: int, replica_lag: float = 0.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.replica_lag = replica_lag
+        # namespace -> (generation, monotonic time it was first seen)
+        self._seen: Dict[str, Tuple[int, float]] = {}
+
+    @classmethod
+    def from_settings(cls) -> "ResponseCache":
+        if settings.CACHE_BACKEND == "redis":
+            backend = RedisCacheBackend(settings.REDIS_URL)
+        elif settings.CACHE_BACKEND == "none":
+            backend = None
+        else:
+            backend = MemoryCacheBackend(
+                settings.CACHE_MAX_ENTRIES,
+                DatabaseGenerations(settings.CACHE_GENERATION_REFRESH_SECONDS),
+            )
+        replica_lag = settings.CACHE_REPLICA_LAG_SECONDS if settings.DATABASE_READ_URL else 0.0
+        return cls(backend, settings.CACHE_TTL_SECONDS, replica_lag)
+
+    async def _key(self, request: Request, namespaces: List[str]) -> Tuple[str, bool]:
+        """Cache key, and whether a response built now may be stored under it"""
+        params = sorted(request.query_params.multi_items())
+        generations = await self.backend.get_counters(namespaces)
+        raw = json.dumps([request.url.path, params, namespaces, generations])
+        return hashlib.sha256(raw.encode()).hexdigest(), self._settled(namespaces, generations)
+
+    def _settled(self, namespaces: List[str], generations: List[int]) -> bool:
+        """False while any namespace changed less than replica_lag seconds ago"""
+        if not self.replica_lag:
+            return True
+        now = time.monotonic()
+        settled = True
+        for namespace, generation in zip(namespaces, generations):
+            seen = self._seen.get(namespace)
+            if seen is None:
+                # First look since startup: nothing is known to be in flight
+                self._seen[namespace] = (generation, now - self.replica_lag)
+            elif seen[0] != generation:
+                self._seen[namespace] = (generation, now)
+                settled = False
+            elif now - seen[1] < self.replica_lag:
+                settled = False
+        return settled
+
+    async def respond(
+        self,
+        request: Request,
+        namespaces: List[str],
+        build: Callable[[], Awaitable[Union[BaseModel, bytes]]],
+        ttl: Optional[int] = None,
+    ) -> Response:
+        """
+        Serve from cache or build, store and serve, honouring If-None-Match.
+        `build` returns a model or an already serialized JSON body.
+        """
+        key = None
+        cached = None
+        store = False
+        if self.backend is not None:
+            key, store = await self._key(request, namespaces)
+            cached = await self.backend.get(key)
+
+        if cached is not None:
+            etag, body = cached.split(b"\n", 1)
+            etag = etag.decode()
+            cache_status = "HIT"
+        else:
+            built = await build()
+            body = built if isinstance(built, bytes) else built.model_dump_json().encode()
+            etag = make_etag(body)
+            cache_status = "MISS"
+            if store:
+                await self.backend.set(key, etag.encode() + b"\n" + body, ttl or self.ttl)
+
+        return conditional_response(request, body, etag, {"X-Cache": cache_status})
+
+    async def invalidate(self, *namespaces: str) -> None:
+        """Make every entry depending on the given namespaces unreachable"""
+        if self.backend is None:
+            return
+        for namespace in namespaces:
+            await self.backend.incr(namespace)
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a response body"""
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def conditional_response(
+    request: Request, body: bytes, etag: str, headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """JSON response with an ETag, or 304 with no body if the client already has it"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache", **(headers or {})}
+    if etag in _parse_etags(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _parse_etags(header: Optional[str]) -> List[str]:
+    if not header:
+        return []
+    return [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+
+response_cache = ResponseCache.from_settings()
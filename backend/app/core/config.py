@@ -41,15 +41,47 @@ class Settings(BaseSettings):
     HOSTAWAY_API_KEY: str
     HOSTAWAY_ACCOUNT_ID: str
     HOSTAWAY_BASE_URL: str = "https://api.hostaway.com/v1"
+    HOSTAWAY_PAGE_SIZE: int = 100  # Reviews requested per limit/offset page
+    HOSTAWAY_MAX_CONCURRENCY: int = 4  # Pages fetched in parallel
+    HOSTAWAY_MAX_RETRIES: int = 3  # Retries on 429/5xx and transport errors
+    HOSTAWAY_RETRY_BACKOFF: float = 0.5  # Base delay in seconds, doubled per retry
+    HOSTAWAY_RATE_LIMIT_PER_SECOND: float = 5.0  # Requests per account, 0 disables the limit
+    HOSTAWAY_TIMEOUT: float = 30.0
+    HOSTAWAY_MAX_CONNECTIONS: int = 10
+    HOSTAWAY_KEEPALIVE_EXPIRY: float = 60.0
+    HOSTAWAY_SNAPSHOT_PATH: str = "./hostaway_snapshot.json"  # Last normalized response
+    HOSTAWAY_SNAPSHOT_TTL_SECONDS: int = 300  # Age after which a background refresh starts
 
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./flexliving.db"
+    DATABASE_READ_URL: str = ""  # Optional read replica for GET endpoints
+    DATABASE_ECHO: bool = False  # Log every SQL statement
+    DATABASE_POOL_SIZE: int = 5  # Connections kept open
+    DATABASE_MAX_OVERFLOW: int = 10  # Extra connections allowed under load
+    DATABASE_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    DATABASE_POOL_RECYCLE: int = 1800  # Reconnect connections older than this (seconds)
+    DATABASE_POOL_PRE_PING: bool = True  # Test connections on checkout
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements, 0 behind pgbouncer
+
+    # SQLite (aiosqlite) pragmas
+    SQLITE_JOURNAL_MODE: str = "wal"
+    SQLITE_SYNCHRONOUS: str = "normal"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 20000
 
     @property
     def ASYNC_DATABASE_URL(self) -> str:
         """Convert DATABASE_URL to async driver format"""
-        url = self.DATABASE_URL
+        return self._to_async_url(self.DATABASE_URL)
 
+    @property
+    def ASYNC_DATABASE_READ_URL(self) -> str:
+        """Convert DATABASE_READ_URL to async driver format"""
+        return self._to_async_url(self.DATABASE_READ_URL)
+
+    @staticmethod
+    def _to_async_url(url: str) -> str:
+        """Use the async driver for PostgreSQL URLs"""
         # If it's already using an async driver, return as-is
         if "aiosqlite" in url or "asyncpg" in url:
             return url
@@ -62,6 +94,38 @@ class Settings(BaseSettings):
 
         return url
 
+    # Sync
+    SYNC_BATCH_SIZE: int = 500  # Rows per multi-row INSERT / IN-list lookup
+    SYNC_UPDATE_EXISTING: bool = True  # Update changed status/rating/text of known reviews
+    SYNC_FULL_RECONCILE_HOURS: int = 24  # Max age of the last full sync before "auto" runs one
+    SYNC_ACCOUNT_CONCURRENCY: int = 2  # Hostaway accounts synced in parallel
+    SYNC_WORKER_ENABLED: bool = True  # Run the sync job worker in the API process
+    SYNC_WORKER_POLL_SECONDS: float = 5.0  # How often the worker checks for jobs queued elsewhere
+    SYNC_JOB_STALE_SECONDS: float = 60.0  # Running jobs without a heartbeat this long are failed
+    SYNC_SCHEDULE_MINUTES: int = 0  # Queue an "auto" sync this often, 0 disables scheduling
+
+    # Public property feeds (pre-rendered, served with CDN cache headers)
+    PUBLIC_FEED_MAX_REVIEWS: int = 50  # Approved reviews per feed, featured first
+    PUBLIC_FEED_MAX_AGE_SECONDS: int = 60  # Browser cache lifetime
+    PUBLIC_FEED_CDN_MAX_AGE_SECONDS: int = 600  # Shared cache lifetime (s-maxage)
+    PUBLIC_FEED_STALE_SECONDS: int = 86400  # stale-while-revalidate / stale-if-error
+
+    # Response cache
+    CACHE_BACKEND: str = "memory"  # "memory" (entries per process), "redis" or "none"
+    CACHE_TTL_SECONDS: int = 300  # Upper bound; writes invalidate sooner
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_GENERATION_REFRESH_SECONDS: float = 1.0  # Memory backend: lag for other processes' writes
+    CACHE_REPLICA_LAG_SECONDS: float = 5.0  # With DATABASE_READ_URL: don't store after invalidation
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Request profiling (requires the pyinstrument package when enabled)
+    PROFILING_ENABLED: bool = False  # Install the profiling middleware and /debug/profiles
+    PROFILING_ADMIN_TOKEN: str = ""  # X-Profile-Token value that profiles a request on demand
+    PROFILING_SAMPLE_RATE: float = 0.0  # Fraction of all other requests profiled at random
+    PROFILING_INTERVAL_SECONDS: float = 0.001  # Sampling interval
+    PROFILING_DIR: str = "./profiles"  # Where speedscope files are written
+    PROFILING_MAX_PROFILES: int = 50  # Older profiles are deleted
+
     # Environment
     ENVIRONMENT: str = "development"
 
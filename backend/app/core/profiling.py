@@ -0,0 +1,158 @@
+"""
+On-demand request profiling.
+
+With PROFILING_ENABLED, a request carrying X-Profile-Token (equal to
+PROFILING_ADMIN_TOKEN), or picked at PROFILING_SAMPLE_RATE, runs under
+pyinstrument in async mode: wall-clock time spent awaiting the database or
+Hostaway is attributed to the coroutine that awaited it. Each profile is
+written to PROFILING_DIR as a speedscope file (flamegraph view at
+https://www.speedscope.app), only the newest PROFILING_MAX_PROFILES are
+kept, and /debug/profiles lists and serves them. The response carries the
+profile's ID in X-Profile-Id. When disabled the middleware is not installed.
+"""
+import asyncio
+import hmac
+import os
+import random
+import re
+import secrets
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+TOKEN_HEADER = "x-profile-token"
+SUFFIX = ".speedscope.json"
+_VALID_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def authorized(token: Optional[str]) -> bool:
+    """Whether `token` is the configured admin token (never true without one)"""
+    if not settings.PROFILING_ADMIN_TOKEN or token is None:
+        return False
+    return hmac.compare_digest(token.encode(), settings.PROFILING_ADMIN_TOKEN.encode())
+
+
+class ProfileStore:
+    """
+    Profile files capped in number, named
+    "<UTC time>-<random>-<method>-<route>-<status>-<ms>ms.speedscope.json"
+    """
+
+    def __init__(self, directory: str, max_profiles: int):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def save(self, name: str, body: bytes) -> None:
+        """Write a profile atomically, then delete the oldest beyond the cap"""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, os.path.join(self.directory, name + SUFFIX))
+
+        # Names start with the UTC time, so they sort oldest first
+        for stale in self._names()[: -self.max_profiles or None]:
+            try:
+                os.remove(os.path.join(self.directory, stale + SUFFIX))
+            except FileNotFoundError:
+                pass  # Pruned by another worker
+
+    def list(self) -> List[Dict[str, object]]:
+        """Stored profiles, newest first"""
+        profiles = []
+        for name in reversed(self._names()):
+            try:
+                size = os.path.getsize(os.path.join(self.directory, name + SUFFIX))
+            except FileNotFoundError:
+                continue
+            profiles.append({"id": name, "size_bytes": size})
+        return profiles
+
+    def find(self, profile_id: str) -> Optional[str]:
+        """Path of the profile with this ID (or X-Profile-Id prefix), None if unknown"""
+        if not _VALID_ID.match(profile_id):
+            return None
+        for name in self._names():
+            if name == profile_id or name.startswith(profile_id + "-"):
+                return os.path.join(self.directory, name + SUFFIX)
+        return None
+
+    def _names(self) -> List[str]:
+        try:
+            entries = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(entry[: -len(SUFFIX)] for entry in entries if entry.endswith(SUFFIX))
+
+
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_PROFILES)
+
+
+def _slug(path: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests that ask for it or are sampled"""
+
+    def __init__(self, app):
+        try:
+            from pyinstrument import Profiler
+            from pyinstrument.renderers import SpeedscopeRenderer
+        except ImportError as e:
+            raise RuntimeError("PROFILING_ENABLED requires the pyinstrument package") from e
+        self.app = app
+        self.profiler_class = Profiler
+        self.renderer_class = SpeedscopeRenderer
+
+    def _wanted(self, scope) -> bool:
+        if scope["path"].startswith("/debug/profiles"):
+            return False
+        for name, value in scope["headers"]:
+            if name == TOKEN_HEADER.encode():
+                return authorized(value.decode("latin-1"))
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        now = time.time()
+        # Microseconds keep IDs in creation order for pruning
+        profile_id = (
+            time.strftime("%Y%m%dT%H%M%S", time.gmtime(now))
+            + f"{int(now * 1e6) % 1000000:06d}-{secrets.token_hex(4)}"
+        )
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-profile-id", profile_id.encode()),
+                ]
+            await send(message)
+
+        profiler = self.profiler_class(
+            interval=settings.PROFILING_INTERVAL_SECONDS, async_mode="enabled"
+        )
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            elapsed_ms = round((time.perf_counter() - started) * 1000)
+            route = getattr(scope.get("route"), "path", scope["path"])
+            name = f"{profile_id}-{scope['method']}-{_slug(route)}-{status}-{elapsed_ms}ms"
+            try:
+                body = profiler.output(self.renderer_class()).encode()
+                await asyncio.to_thread(profile_store.save, name, body)
+            except Exception as e:
+                # Never fail a request because its profile could not be kept
+                print(f"Could not save profile {name}: {e}")
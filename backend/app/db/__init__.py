@@ -1,3 +1,3 @@
-from app.db.database import get_db, init_db
+from app.db.database import get_db, get_read_db, init_db
 
-__all__ = ["get_db", "init_db"]
+__all__ = ["get_db", "get_read_db", "init_db"]
@@ -1,15 +1,83 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from typing import Any, Dict
+import orjson
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    create_async_engine,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 from app.models import Base
+from app.db.migrations import run_migrations
+from app.db.pool import MonitoredQueuePool, pool_metrics
+
+
+def create_engine(url: str) -> AsyncEngine:
+    """Create an async engine with the pool and driver settings for its backend"""
+    database = make_url(url)
+    options: Dict[str, Any] = {
+        "echo": settings.DATABASE_ECHO,
+        "future": True,
+        # JSON columns (review categories) are decoded on every listing row
+        "json_deserializer": orjson.loads,
+    }
+
+    if database.get_backend_name() == "sqlite":
+        in_memory = database.database in (None, "", ":memory:")
+        if not in_memory:
+            options.update(_pool_options())
+        engine = create_async_engine(url, **options)
+        if not in_memory:
+            event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+        return engine
+
+    options.update(_pool_options())
+    if database.get_driver_name() == "asyncpg":
+        # 0 disables prepared statement caching (needed behind pgbouncer)
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        }
+    return create_async_engine(url, **options)
+
+
+def _pool_options() -> Dict[str, Any]:
+    return {
+        "poolclass": MonitoredQueuePool,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    }
 
-# Create async engine
-engine = create_async_engine(
-    settings.ASYNC_DATABASE_URL,
-    echo=settings.ENVIRONMENT == "development",
-    future=True,
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """WAL lets readers proceed during sync writes; busy_timeout waits out short locks"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size={-settings.SQLITE_CACHE_SIZE_KB}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+# Create async engines: writes always use the primary, GET endpoints the replica if set
+engine = create_engine(settings.ASYNC_DATABASE_URL)
+read_engine = (
+    create_engine(settings.ASYNC_DATABASE_READ_URL)
+    if settings.DATABASE_READ_URL
+    else engine
 )
+instrument_engine(engine, "primary")
+if read_engine is not engine:
+    instrument_engine(read_engine, "replica")
 
-# Create session maker
+# Create session makers
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -17,12 +85,20 @@ AsyncSessionLocal = async_sessionmaker(
     autocommit=False,
     autoflush=False,
 )
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
 
 
 async def init_db():
-    """Initialize database tables"""
+    """Initialize database tables and apply pending migrations"""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
 
 
 async def get_db():
@@ -32,3 +108,31 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+async def get_read_db():
+    """
+    Dependency to get a session for read-only endpoints, on the replica when
+    DATABASE_READ_URL is set. Sessions connect lazily, so requests answered
+    from the response cache never check out a connection.
+    """
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def dispose_engines() -> None:
+    """Close all pooled connections (called on shutdown)"""
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+
+def database_metrics() -> Dict[str, Any]:
+    """Pool metrics for the primary and, if configured, the read replica"""
+    metrics = {"primary": pool_metrics(engine.pool)}
+    if read_engine is not engine:
+        metrics["replica"] = pool_metrics(read_engine.pool)
+    return metrics
@@ -0,0 +1,258 @@
+"""
+Lightweight schema migrations.
+
+`Base.metadata.create_all` only creates missing tables, so changes to existing
+tables (new indexes, columns, backfills) are applied here. Each migration runs
+once, in order, and is recorded in the schema_migrations table. Migrations must
+be idempotent because fresh databases already get the current schema from
+create_all.
+"""
+from typing import Callable, List, Tuple
+from sqlalchemy import (
+    Table,
+    Column,
+    String,
+    DateTime,
+    MetaData,
+    select,
+    insert,
+    update,
+    inspect,
+    text,
+    bindparam,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import func
+
+from app.core.config import settings
+from app.models.review import Review
+from app.models.review_category_rating import ReviewCategoryRating
+from app.models.sync_job import SyncJob
+from app.services.daily_stats import rebuild_statements
+from app.services.normalizer import effective_rating
+from app.services.review_search import create_search_index
+from app.services.sync import category_rating_rows
+
+# Rows read and rewritten per statement by backfills
+BACKFILL_BATCH_SIZE = 1000
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", String, primary_key=True),
+    Column("applied_at", DateTime, server_default=func.now()),
+)
+
+
+def _create_indexes(conn: Connection, table: Table, names: List[str]) -> None:
+    """Create the named indexes declared on a model if they do not exist yet"""
+    for index in table.indexes:
+        if index.name in names:
+            index.create(conn, checkfirst=True)
+
+
+def review_composite_indexes(conn: Connection) -> None:
+    """Composite indexes for the get_reviews access patterns"""
+    _create_indexes(
+        conn,
+        Review.__table__,
+        [
+            "ix_reviews_submitted_at_id",
+            "ix_reviews_property_submitted_at",
+            "ix_reviews_approved_submitted_at",
+            "ix_reviews_channel_submitted_at",
+        ],
+    )
+
+
+def _add_columns(conn: Connection, table: Table, names: List[str]) -> None:
+    """Add the named columns declared on a model if the table lacks them"""
+    existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    for name in names:
+        if name in existing:
+            continue
+        column = table.c[name]
+        ddl = f"ALTER TABLE {table.name} ADD COLUMN {name} {column.type.compile(conn.dialect)}"
+        if column.default is not None and column.default.is_scalar:
+            ddl += f" DEFAULT {column.default.arg!r}"
+        if not column.nullable:
+            ddl += " NOT NULL"
+        conn.execute(text(ddl))
+
+
+def multi_account_columns(conn: Connection) -> None:
+    """Account columns on reviews and sync_jobs; existing reviews belong to the default account"""
+    _add_columns(conn, Review.__table__, ["account_id"])
+    _create_indexes(conn, Review.__table__, ["ix_reviews_account_id"])
+    conn.execute(
+        update(Review.__table__)
+        .where(Review.__table__.c.account_id.is_(None))
+        .values(account_id=settings.HOSTAWAY_ACCOUNT_ID)
+    )
+    _add_columns(conn, SyncJob.__table__, ["account_id", "accounts_total", "accounts_done"])
+
+
+def review_average_rating(conn: Connection) -> None:
+    """Stored effective rating and category count, backfilled from review_categories"""
+    reviews = Review.__table__
+    _add_columns(conn, reviews, ["average_rating", "category_count"])
+    _create_indexes(conn, reviews, ["ix_reviews_average_rating_id"])
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(reviews.c.id, reviews.c.rating, reviews.c.review_categories)
+            .where(reviews.c.id > last_id)
+            .order_by(reviews.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            update(reviews)
+            .where(reviews.c.id == bindparam("review_id"))
+            .values(
+                average_rating=bindparam("average_rating"),
+                category_count=bindparam("category_count"),
+            ),
+            [
+                {
+                    "review_id": row.id,
+                    "average_rating": effective_rating(
+                        row.rating, row.review_categories or []
+                    ),
+                    "category_count": len(row.review_categories or []),
+                }
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+
+def review_category_ratings(conn: Connection) -> None:
+    """Fill review_category_ratings (created by create_all) from review_categories"""
+    reviews = Review.__table__
+    ratings = ReviewCategoryRating.__table__
+    conn.execute(ratings.delete())
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(reviews.c.id, reviews.c.review_categories)
+            .where(reviews.c.id > last_id)
+            .order_by(reviews.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        category_rows = category_rating_rows(row._asdict() for row in rows)
+        if category_rows:
+            conn.execute(insert(ratings), category_rows)
+        last_id = rows[-1].id
+
+
+def review_daily_stats(conn: Connection) -> None:
+    """Fill review_daily_stats (created by create_all) from existing reviews"""
+    for stmt in rebuild_statements():
+        conn.execute(stmt)
+
+
+def review_search_index(conn: Connection) -> None:
+    """Full-text index on public_review (tsvector + GIN, or FTS5 with triggers)"""
+    create_search_index(conn)
+
+
+def _drop_column(conn: Connection, table: str, name: str) -> None:
+    """Drop a column no longer in the models, where the database supports it"""
+    existing = {column["name"] for column in inspect(conn).get_columns(table)}
+    if name not in existing:
+        return
+    # SQLite only supports DROP COLUMN from 3.35; older versions keep the unused column
+    if conn.dialect.name == "sqlite" and conn.dialect.server_version_info < (3, 35):
+        return
+    conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {name}"))
+
+
+def listings_dimension(conn: Connection) -> None:
+    """Fill listings (created by create_all) from reviews, point reviews at them by id"""
+    _add_columns(conn, Review.__table__, ["listing_ref_id"])
+    _create_indexes(conn, Review.__table__, ["ix_reviews_listing_ref_id"])
+
+    existing = {column["name"] for column in inspect(conn).get_columns("reviews")}
+    if "listing_name" in existing:
+        # Same keys as app.services.listings.listing_row: without listingMapId
+        # the stored listing_id is the review ID, so such listings key by name
+        params = {"default_account": settings.HOSTAWAY_ACCOUNT_ID}
+        account = "coalesce(reviews.account_id, :default_account)"
+        key = (
+            "CASE WHEN reviews.listing_id = reviews.external_id "
+            "THEN coalesce(reviews.listing_name, '') ELSE reviews.listing_id END"
+        )
+        conn.execute(
+            text(
+                f"""
+                INSERT INTO listings (account_id, external_id, name, property_id)
+                SELECT {account}, {key}, coalesce(max(reviews.listing_name), ''),
+                       coalesce(max(reviews.property_id), '')
+                FROM reviews WHERE true
+                GROUP BY {account}, {key}
+                ON CONFLICT (account_id, external_id) DO NOTHING
+                """
+            ),
+            params,
+        )
+        conn.execute(
+            text(
+                f"""
+                UPDATE reviews SET listing_ref_id = (
+                    SELECT listings.id FROM listings
+                    WHERE listings.account_id = {account} AND listings.external_id = {key}
+                )
+                WHERE reviews.listing_ref_id IS NULL
+                """
+            ),
+            params,
+        )
+
+    # Names now live on listings only
+    _drop_column(conn, "reviews", "listing_name")
+    _drop_column(conn, "property_stats", "listing_name")
+
+
+def review_rating_desc_index(conn: Connection) -> None:
+    """DESC NULLS LAST rating index for sort=rating_desc (PostgreSQL only, see the model)"""
+    _create_indexes(conn, Review.__table__, ["ix_reviews_average_rating_desc_id"])
+
+
+def sync_job_heartbeat(conn: Connection) -> None:
+    """Worker ID and heartbeat of running sync jobs"""
+    _add_columns(conn, SyncJob.__table__, ["locked_by", "heartbeat_at"])
+
+
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = [
+    ("0001_review_composite_indexes", review_composite_indexes),
+    ("0002_multi_account_columns", multi_account_columns),
+    ("0003_review_average_rating", review_average_rating),
+    ("0004_review_category_ratings", review_category_ratings),
+    ("0005_review_daily_stats", review_daily_stats),
+    ("0006_review_search_index", review_search_index),
+    ("0007_listings_dimension", listings_dimension),
+    ("0008_review_rating_desc_index", review_rating_desc_index),
+    ("0009_sync_job_heartbeat", sync_job_heartbeat),
+]
+
+
+def run_migrations(conn: Connection) -> List[str]:
+    """Apply pending migrations, returns the versions applied"""
+    schema_migrations.create(conn, checkfirst=True)
+    applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+    newly_applied = []
+    for version, migration in MIGRATIONS:
+        if version in applied:
+            continue
+        migration(conn)
+        conn.execute(insert(schema_migrations).values(version=version))
+        newly_applied.append(version)
+
+    return newly_applied
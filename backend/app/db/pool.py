@@ -0,0 +1,62 @@
+"""
+Connection pool with checkout metrics.
+
+Wraps SQLAlchemy's AsyncAdaptedQueuePool so the time spent waiting for a
+connection is measured alongside the pool's own checked-out/overflow counts.
+"""
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long and how many callers wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiters = 0  # Callers currently waiting for a connection
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        self.waiters += 1
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.waiters -= 1
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of pool usage for monitoring"""
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": self.overflow(),
+            "waiters": self.waiters,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+            "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6)
+            if self.checkouts
+            else 0.0,
+        }
+
+
+def pool_metrics(pool) -> Dict[str, Any]:
+    """Metrics for any pool; pools other than MonitoredQueuePool only report their class"""
+    if isinstance(pool, MonitoredQueuePool):
+        return pool.metrics()
+    return {"pool": type(pool).__name__}
@@ -0,0 +1,163 @@
+"""
+Query-plan regression checks for the hot review queries.
+
+Each hot query is EXPLAINed against the configured database and must use its
+expected index without an extra sort step. Run with `python -m app.cli
+check-plans` against SQLite and against PostgreSQL (see the postgres profile
+in docker-compose.yml) after schema changes.
+"""
+import json
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple, Union
+from sqlalchemy import and_, func, select, Select
+from sqlalchemy.engine import Connection
+
+from app.models.review import Review
+from app.models.review_category_rating import ReviewCategoryRating
+from app.models.review_daily_stats import ReviewDailyStats
+from app.services.pagination import after_cursor, encode_cursor
+from app.services.review_queries import review_filters, newest_first, by_rating
+from app.services.review_serializer import select_listing_rows
+
+_SAMPLE_CURSOR = encode_cursor(datetime(2024, 6, 1), 1000)
+
+
+def _reviews_query(**filters) -> Select:
+    """The SELECT get_reviews sends: listing columns joined to listings, filtered"""
+    query = select_listing_rows()
+    conditions = review_filters(**filters)
+    if conditions:
+        query = query.where(and_(*conditions))
+    return query
+
+
+def _reviews_page(**filters) -> Select:
+    return newest_first(_reviews_query(**filters)).limit(100)
+
+
+# The index each dialect can serve sort=rating_desc (unrated last) with
+_RATING_DESC_INDEX = {
+    "postgresql": "ix_reviews_average_rating_desc_id",
+    "sqlite": "ix_reviews_average_rating_id",
+}
+
+# (name, query factory, index the plan must use, or that index per dialect)
+HOT_QUERIES: List[Tuple[str, Callable[[], Select], Union[str, Dict[str, str]]]] = [
+    ("reviews newest page", lambda: _reviews_page(), "ix_reviews_submitted_at_id"),
+    (
+        "reviews keyset page",
+        lambda: _reviews_page().where(after_cursor(_SAMPLE_CURSOR)),
+        "ix_reviews_submitted_at_id",
+    ),
+    (
+        "reviews by property",
+        lambda: _reviews_page(property_id="2B N1 A"),
+        "ix_reviews_property_submitted_at",
+    ),
+    (
+        "reviews by property, keyset page",
+        lambda: _reviews_page(property_id="2B N1 A").where(after_cursor(_SAMPLE_CURSOR)),
+        "ix_reviews_property_submitted_at",
+    ),
+    (
+        "reviews by approval",
+        lambda: _reviews_page(is_approved=True),
+        "ix_reviews_approved_submitted_at",
+    ),
+    (
+        "reviews by channel",
+        lambda: _reviews_page(channel="Airbnb"),
+        "ix_reviews_channel_submitted_at",
+    ),
+    (
+        "reviews by rating",
+        lambda: by_rating(_reviews_query(min_rating=8.0)).limit(100),
+        _RATING_DESC_INDEX,
+    ),
+    (
+        "reviews by rating, ascending",
+        lambda: by_rating(_reviews_query(min_rating=8.0), descending=False).limit(100),
+        "ix_reviews_average_rating_id",
+    ),
+    (
+        "category averages",
+        lambda: select(ReviewCategoryRating.category, func.avg(ReviewCategoryRating.rating))
+        .group_by(ReviewCategoryRating.category),
+        "ix_review_category_ratings_category_rating",
+    ),
+    (
+        "daily category trend",
+        lambda: select(ReviewDailyStats.day, func.sum(ReviewDailyStats.rating_sum))
+        .where(ReviewDailyStats.category == "cleanliness")
+        .group_by(ReviewDailyStats.day),
+        "ix_review_daily_stats_category_day",
+    ),
+    (
+        "sync existing-id lookup",
+        lambda: select(Review.id, Review.external_id).where(
+            Review.external_id.in_(["7453", "7454", "7455"])
+        ),
+        "ix_reviews_external_id",
+    ),
+]
+
+
+def _compile(conn: Connection, query: Select) -> Tuple[str, tuple]:
+    compiled = query.compile(
+        dialect=conn.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    params = tuple(compiled.params[name] for name in compiled.positiontup or ())
+    return str(compiled), params
+
+
+def explain(conn: Connection, query: Select) -> List[str]:
+    """Return the plan of a query as lines of text"""
+    sql, params = _compile(conn, query)
+
+    if conn.dialect.name == "postgresql":
+        # Judge whether the index is usable, not what the planner prefers on tiny tables
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        row = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}", params).scalar()
+        plan = json.loads(row) if isinstance(row, str) else row
+        lines: List[str] = []
+        _flatten_pg_plan(plan[0]["Plan"], lines)
+        return lines
+
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params).all()
+    return [row[-1] for row in rows]
+
+
+def _flatten_pg_plan(node: dict, lines: List[str]) -> None:
+    lines.append(
+        " ".join(
+            part
+            for part in (
+                node.get("Node Type", ""),
+                f"on {node['Relation Name']}" if "Relation Name" in node else "",
+                f"using {node['Index Name']}" if "Index Name" in node else "",
+            )
+            if part
+        )
+    )
+    for child in node.get("Plans", []):
+        _flatten_pg_plan(child, lines)
+
+
+def check_query_plans(conn: Connection) -> List[str]:
+    """EXPLAIN every hot query, returns a description of each regression"""
+    problems = []
+    for name, build_query, index_name in HOT_QUERIES:
+        if not isinstance(index_name, str):
+            index_name = index_name[conn.dialect.name]
+        plan = explain(conn, build_query())
+        text = "\n".join(plan)
+
+        if index_name not in text:
+            problems.append(f"{name}: expected index {index_name}, plan: {plan}")
+        # SQLite reports an unindexed ORDER BY as a temp b-tree, PostgreSQL as a Sort node
+        if "TEMP B-TREE" in text or any(line.startswith("Sort") for line in plan):
+            problems.append(f"{name}: ORDER BY is not served by an index, plan: {plan}")
+        if "Seq Scan on reviews" in text:
+            problems.append(f"{name}: sequential scan of reviews, plan: {plan}")
+
+    return problems
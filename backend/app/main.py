@@ -1,10 +1,19 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
+from app.core.cache import response_cache
+from app.core import metrics
+from app.core.profiling import ProfilingMiddleware
 from app.db import init_db
-from app.api.routes import reviews
+from app.db.database import AsyncSessionLocal, database_metrics, dispose_engines
+from app.services.public_feed import PublicFeedService
+from app.services.stats import StatsService
+from app.services.hostaway import open_http_client, close_http_client
+from app.services.snapshot import hostaway_snapshot
+from app.services.sync_jobs import sync_jobs
+from app.api.routes import profiles, reviews
 
 
 @asynccontextmanager
@@ -13,8 +22,23 @@ async def lifespan(app: FastAPI):
     # Startup: Initialize database
     await init_db()
     print("Database initialized")
+    async with AsyncSessionLocal() as session:
+        if await StatsService(session).rebuild_if_empty():
+            print("Property stats rebuilt from reviews")
+        if await PublicFeedService(session).rebuild_if_empty():
+            print("Public review feeds rendered")
+    # Startup: Open the shared Hostaway client (connection pooling, HTTP/2)
+    await open_http_client()
+    # Startup: Run queued and scheduled syncs in the background
+    if settings.SYNC_WORKER_ENABLED:
+        sync_jobs.start()
     yield
     # Shutdown: cleanup if needed
+    await sync_jobs.stop()
+    await hostaway_snapshot.close()
+    await close_http_client()
+    await response_cache.close()
+    await dispose_engines()
     print("Shutting down...")
 
 
@@ -26,6 +50,13 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Profile requests on demand (X-Profile-Token) or at PROFILING_SAMPLE_RATE
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Record latency and SQL queries per route
+app.add_middleware(metrics.RequestMetricsMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -37,6 +68,8 @@ app.add_middleware(
 
 # Include routers
 app.include_router(reviews.router)
+if settings.PROFILING_ENABLED:
+    app.include_router(profiles.router)
 
 
 @app.get("/")
@@ -53,3 +86,19 @@ async def root():
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "environment": settings.ENVIRONMENT}
+
+
+@app.get("/health/db")
+async def database_health():
+    """Connection pool usage (checked out, waiters, wait time)"""
+    return database_metrics()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus metrics (requests, SQL, Hostaway, sync, connection pools)"""
+    for name, pool in database_metrics().items():
+        for metric, value in pool.items():
+            if isinstance(value, (int, float)):
+                metrics.DB_POOL.set(value, engine=name, metric=metric)
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
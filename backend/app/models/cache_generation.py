@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String
+from app.models import Base
+
+
+class CacheGeneration(Base):
+    """Current generation of a response cache namespace, bumped by every invalidation"""
+
+    __tablename__ = "cache_generations"
+
+    namespace = Column(String, primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CacheGeneration {self.namespace} - {self.generation}>"
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Float, DateTime, Boolean
+from sqlalchemy.sql import func
+from app.models import Base
+
+
+class HostawayAccount(Base):
+    """Credentials and limits for one Hostaway account to sync"""
+
+    __tablename__ = "hostaway_accounts"
+
+    account_id = Column(String, primary_key=True)  # Hostaway account ID
+    api_key = Column(String, nullable=False)
+    name = Column(String, nullable=True)  # Portfolio label
+    is_active = Column(Boolean, default=True, nullable=False)
+
+    # Requests per second for this account, overrides HOSTAWAY_RATE_LIMIT_PER_SECOND
+    rate_limit_per_second = Column(Float, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<HostawayAccount {self.account_id} - {self.name}>"
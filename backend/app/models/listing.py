@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.models import Base
+
+
+class Listing(Base):
+    """A Hostaway listing; reviews reference it instead of repeating its name"""
+
+    __tablename__ = "listings"
+    __table_args__ = (
+        UniqueConstraint("account_id", "external_id", name="uq_listings_account_external_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    account_id = Column(String, nullable=False)  # Hostaway account it belongs to
+    # Hostaway listing ID, or the listing name for payloads without listingMapId
+    external_id = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    property_id = Column(String, nullable=False, index=True)  # Normalized property identifier
+
+    # Timestamps
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<Listing {self.external_id} - {self.name}>"
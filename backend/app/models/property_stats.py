@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON
+from sqlalchemy.sql import func
+from app.models import Base
+
+
+class PropertyStatsRollup(Base):
+    """Per-property review statistics maintained incrementally on write"""
+
+    __tablename__ = "property_stats"
+
+    property_id = Column(String, primary_key=True)  # Names come from the listings table
+
+    # Review counts and overall rating sums
+    total_reviews = Column(Integer, default=0, nullable=False)
+    rating_sum = Column(Float, default=0.0, nullable=False)
+    rating_count = Column(Integer, default=0, nullable=False)
+
+    # Category rating sums and counts (stored as JSON)
+    category_sums = Column(JSON, default=dict)  # {"cleanliness": 95.0}
+    category_counts = Column(JSON, default=dict)  # {"cleanliness": 10}
+
+    # Manager actions
+    approved_count = Column(Integer, default=0, nullable=False)
+    featured_count = Column(Integer, default=0, nullable=False)
+
+    # Most recent reviews, newest first, used for the trend
+    recent_reviews = Column(JSON, default=list)  # [{"id": "7453", "submitted_at": "...", "rating": 9.5}]
+
+    # Timestamps
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<PropertyStatsRollup {self.property_id} - {self.total_reviews} reviews>"
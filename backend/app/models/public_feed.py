@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, DateTime, LargeBinary
+from app.models import Base
+
+
+class PublicFeed(Base):
+    """Pre-rendered public review feed of one property, stored gzip-compressed"""
+
+    __tablename__ = "public_feeds"
+
+    property_id = Column(String, primary_key=True)
+    body = Column(LargeBinary, nullable=False)  # gzip of the PublicReviewFeed JSON
+    etag = Column(String, nullable=False)  # Of the uncompressed JSON
+    generated_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<PublicFeed {self.property_id} - {self.generated_at}>"
@@ -1,4 +1,15 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON, Text
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Float,
+    DateTime,
+    Boolean,
+    JSON,
+    Text,
+    Index,
+    ForeignKey,
+)
 from sqlalchemy.sql import func
 from app.models import Base
 
@@ -7,21 +18,33 @@ class Review(Base):
     """Review model for storing guest reviews"""
 
     __tablename__ = "reviews"
+    __table_args__ = (
+        # Composite indexes matching get_reviews: filter column + newest-first order
+        Index("ix_reviews_submitted_at_id", "submitted_at", "id"),
+        Index("ix_reviews_property_submitted_at", "property_id", "submitted_at", "id"),
+        Index("ix_reviews_approved_submitted_at", "is_approved", "submitted_at", "id"),
+        Index("ix_reviews_channel_submitted_at", "channel", "submitted_at", "id"),
+        # Rating filters and sorts on the effective rating
+        Index("ix_reviews_average_rating_id", "average_rating", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     external_id = Column(String, unique=True, index=True)  # ID from Hostaway
+    account_id = Column(String, index=True, nullable=True)  # Hostaway account it came from
     listing_id = Column(String, index=True)
-    listing_name = Column(String)
+    listing_ref_id = Column(Integer, ForeignKey("listings.id"), index=True)  # Name lives there
     property_id = Column(String, index=True)  # Normalized property identifier
 
     # Review details
     review_type = Column(String)  # host-to-guest, guest-to-host
     status = Column(String)  # published, pending
     rating = Column(Float, nullable=True)  # Overall rating
+    average_rating = Column(Float, nullable=True)  # Rating, or the category average without one
     public_review = Column(Text)
 
     # Categories (stored as JSON)
     review_categories = Column(JSON)  # [{"category": "cleanliness", "rating": 10}]
+    category_count = Column(Integer, default=0, nullable=False)
 
     # Metadata
     guest_name = Column(String)
@@ -37,4 +60,15 @@ class Review(Base):
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     def __repr__(self):
-        return f"<Review {self.external_id} - {self.listing_name}>"
+        return f"<Review {self.external_id} - {self.listing_id}>"
+
+
+# sort=rating_desc keeps unrated reviews last. PostgreSQL sorts NULL first in
+# DESC order, so a backward scan of ix_reviews_average_rating_id cannot serve
+# it. SQLite sorts NULL lowest and rejects NULLS LAST in indexes, so it uses
+# the ascending index for both directions.
+Index(
+    "ix_reviews_average_rating_desc_id",
+    Review.average_rating.desc().nulls_last(),
+    Review.id.desc(),
+).ddl_if(dialect="postgresql")
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
+from app.models import Base
+
+
+class ReviewCategoryRating(Base):
+    """One category rating of a review, mirrored from Review.review_categories"""
+
+    __tablename__ = "review_category_ratings"
+    __table_args__ = (
+        # Per-category averages and distributions
+        Index("ix_review_category_ratings_category_rating", "category", "rating"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    review_id = Column(
+        Integer, ForeignKey("reviews.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    category = Column(String, nullable=False)  # cleanliness, communication, ...
+    rating = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"<ReviewCategoryRating {self.review_id} - {self.category}: {self.rating}>"
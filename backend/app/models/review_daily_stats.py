@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Float, Date, Index
+from app.models import Base
+
+
+class ReviewDailyStats(Base):
+    """
+    Reviews per submission day, property and channel, maintained on sync.
+
+    Rows with an empty category hold overall (effective) ratings; rows with a
+    category hold that category's ratings for the same slice.
+    """
+
+    __tablename__ = "review_daily_stats"
+    __table_args__ = (Index("ix_review_daily_stats_category_day", "category", "day"),)
+
+    day = Column(Date, primary_key=True)
+    property_id = Column(String, primary_key=True)  # "" when the review has none
+    channel = Column(String, primary_key=True)  # "" when the review has none
+    category = Column(String, primary_key=True)  # "" for the overall rating
+
+    review_count = Column(Integer, default=0, nullable=False)
+    rating_sum = Column(Float, default=0.0, nullable=False)
+    rating_count = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<ReviewDailyStats {self.day} {self.property_id} {self.channel} {self.category}>"
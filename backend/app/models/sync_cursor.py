@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from app.models import Base
+
+
+class SyncCursor(Base):
+    """High-water mark of the Hostaway review sync, one row per account"""
+
+    __tablename__ = "sync_cursors"
+
+    account_id = Column(String, primary_key=True)  # Hostaway account ID
+
+    # Newest review seen so far
+    last_submitted_at = Column(DateTime, nullable=True)
+    last_external_id = Column(String, nullable=True)
+
+    # Sync runs
+    last_sync_at = Column(DateTime, nullable=True)  # Last successful sync of any kind
+    last_full_sync_at = Column(DateTime, nullable=True)  # Last full reconciliation
+
+    # Timestamps
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<SyncCursor {self.account_id} - {self.last_submitted_at}>"
@@ -0,0 +1,51 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy.sql import func
+from app.models import Base
+
+
+class SyncJob(Base):
+    """A queued or finished Hostaway sync run and its progress"""
+
+    __tablename__ = "sync_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, nullable=False, index=True)  # queued, running, succeeded, failed
+    trigger = Column(String, nullable=False)  # manual, scheduled
+    account_id = Column(String, nullable=True)  # None syncs every active account
+
+    # Requested options and the mode actually run
+    requested_mode = Column(String, nullable=False)  # auto, incremental, full
+    update_existing = Column(Boolean, nullable=True)
+    mode = Column(String, nullable=True)  # incremental, full, or mixed across accounts
+
+    # Progress across all accounts, updated while the job runs
+    accounts_total = Column(Integer, default=0, nullable=False)
+    accounts_done = Column(Integer, default=0, nullable=False)
+    pages_fetched = Column(Integer, default=0, nullable=False)
+    rows_written = Column(Integer, default=0, nullable=False)
+    inserted = Column(Integer, default=0, nullable=False)
+    updated = Column(Integer, default=0, nullable=False)
+    unchanged = Column(Integer, default=0, nullable=False)
+    deleted = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)
+
+    # Worker running the job and when it last reported; stale heartbeats mark dead workers
+    locked_by = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    @property
+    def duration_seconds(self):
+        """Run time so far, or in total once finished"""
+        if self.started_at is None:
+            return None
+        end = self.finished_at or datetime.utcnow()
+        return round((end - self.started_at).total_seconds(), 3)
+
+    def __repr__(self):
+        return f"<SyncJob {self.id} - {self.status}>"
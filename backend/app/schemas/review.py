@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional
+from datetime import date, datetime
 
 
 class ReviewCategory(BaseModel):
@@ -67,12 +67,110 @@ class ReviewUpdate(BaseModel):
     is_featured: Optional[bool] = None
 
 
+class ReviewFilter(BaseModel):
+    """Reviews selected by the GET /api/reviews filters"""
+
+    property_id: Optional[str] = None
+    channel: Optional[str] = None
+    min_rating: Optional[float] = None
+    is_approved: Optional[bool] = None
+
+
+class BulkReviewUpdate(ReviewUpdate):
+    """Approval/featured values for a list of reviews or every review matching a filter"""
+
+    ids: Optional[List[str]] = Field(None, max_length=1000)  # External review IDs
+    filter: Optional[ReviewFilter] = None
+
+
+class BulkUpdateOutcome(BaseModel):
+    """What a bulk update did to one review"""
+
+    id: str
+    outcome: str  # updated, unchanged, not_found
+
+
+class BulkUpdateResponse(BaseModel):
+    """API response for a bulk review update"""
+
+    status: str = "success"
+    matched: int
+    updated: int
+    results: List[BulkUpdateOutcome]
+
+
 class ReviewResponse(BaseModel):
     """API response for reviews"""
 
     status: str = "success"
     total: int
     data: List[ReviewNormalized]
+    next_cursor: Optional[str] = None  # Set in cursor pagination when more pages exist
+
+
+class ReviewSearchResult(ReviewNormalized):
+    """Review matching a `q` search"""
+
+    rank: float  # Relevance, higher is better
+    snippet: Optional[str] = None  # HTML-escaped excerpt of public_review, matches in <mark>
+
+
+class ReviewSearchResponse(ReviewResponse):
+    """API response for a review search"""
+
+    data: List[ReviewSearchResult]
+
+
+class PublicReviewFeed(BaseModel):
+    """Approved reviews of one property for the public site, featured first"""
+
+    property_id: str
+    listing_name: Optional[str] = None
+    total_reviews: int  # Approved reviews, including those beyond the feed limit
+    average_rating: Optional[float] = None  # Over the approved reviews
+    featured_count: int
+    reviews: List[ReviewNormalized]
+    generated_at: datetime
+
+
+class SyncResult(BaseModel):
+    """Outcome of syncing reviews into the database"""
+
+    mode: str = "full"  # "full" or "incremental"
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    listings_written: int = 0  # Listings added, renamed or moved to another property
+
+
+class SyncJobStatus(BaseModel):
+    """Status and progress of a background sync job"""
+
+    id: int
+    status: str  # queued, running, succeeded, failed
+    trigger: str  # manual, scheduled
+    account_id: Optional[str] = None  # None syncs every active account
+    requested_mode: str
+    mode: Optional[str] = None  # Resolved once the job starts
+    accounts_total: int = 0
+    accounts_done: int = 0
+    pages_fetched: int = 0
+    rows_written: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    error: Optional[str] = None
+    locked_by: Optional[str] = None  # Worker running the job
+    heartbeat_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+
+    class Config:
+        from_attributes = True
 
 
 class PropertyStats(BaseModel):
@@ -95,3 +193,53 @@ class DashboardStats(BaseModel):
     total_properties: int
     average_rating: float
     properties: List[PropertyStats]
+
+
+class CategoryStats(BaseModel):
+    """Ratings of one review category"""
+
+    category: str
+    average_rating: float
+    rating_count: int
+    min_rating: float
+    max_rating: float
+    distribution: Dict[str, int]  # {"9": 12, "10": 30}, per whole rating point
+
+
+class WeakestCategory(BaseModel):
+    """Lowest-rated category of a property"""
+
+    property_id: str
+    category: str
+    average_rating: float
+    rating_count: int
+
+
+class CategoryAnalytics(BaseModel):
+    """Category rating analytics for the dashboard"""
+
+    categories: List[CategoryStats]
+    weakest_by_property: List[WeakestCategory]
+
+
+class TimeseriesPoint(BaseModel):
+    """Review volume and rating for one day, week or month"""
+
+    period_start: date
+    review_count: int
+    average_rating: Optional[float] = None  # None when no review in the period is rated
+
+
+class TimeseriesSeries(BaseModel):
+    """Points for one property, channel or category ("all" when not grouped)"""
+
+    key: str
+    points: List[TimeseriesPoint]
+
+
+class TimeseriesResponse(BaseModel):
+    """Rating trend time series for dashboard charts"""
+
+    interval: str  # day, week, month
+    group_by: Optional[str] = None  # property, channel, category
+    series: List[TimeseriesSeries]
@@ -0,0 +1,61 @@
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.models.hostaway_account import HostawayAccount
+from app.services.hostaway import default_account
+
+
+class AccountService:
+    """Hostaway accounts to sync, falling back to the one configured in settings"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_accounts(self, active_only: bool = True) -> List[HostawayAccount]:
+        """
+        Registered accounts, ordered by ID. Until any account is registered the
+        HOSTAWAY_ACCOUNT_ID / HOSTAWAY_API_KEY account is used on its own.
+        """
+        query = select(HostawayAccount).order_by(HostawayAccount.account_id)
+        if active_only:
+            query = query.where(HostawayAccount.is_active.is_(True))
+        result = await self.db.execute(query)
+        accounts = list(result.scalars().all())
+
+        if not accounts and not await self._any_registered():
+            return [default_account()]
+        return accounts
+
+    async def get_account(self, account_id: str) -> Optional[HostawayAccount]:
+        account = await self.db.get(HostawayAccount, account_id)
+        if account is None and not await self._any_registered():
+            fallback = default_account()
+            if fallback.account_id == account_id:
+                return fallback
+        return account
+
+    async def save_account(
+        self,
+        account_id: str,
+        api_key: str,
+        name: Optional[str] = None,
+        rate_limit_per_second: Optional[float] = None,
+        is_active: bool = True,
+    ) -> HostawayAccount:
+        """Register an account or update its credentials and limits"""
+        account = await self.db.get(HostawayAccount, account_id)
+        if account is None:
+            account = HostawayAccount(account_id=account_id)
+            self.db.add(account)
+
+        account.api_key = api_key
+        account.name = name
+        account.rate_limit_per_second = rate_limit_per_second
+        account.is_active = is_active
+        await self.db.commit()
+        return account
+
+    async def _any_registered(self) -> bool:
+        result = await self.db.execute(select(HostawayAccount.account_id).limit(1))
+        return result.first() is not None
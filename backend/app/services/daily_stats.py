@@ -0,0 +1,315 @@
+"""
+Daily review rollups behind the rating trend time series.
+
+review_daily_stats holds one row per (submission day, property, channel,
+category) and is kept current by the sync with upserts that add deltas, so
+week/month series are summed from a few hundred daily rows instead of
+scanning reviews. Deletions fall back to a rebuild (see StatsService.rebuild).
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, func, delete, insert, literal, bindparam
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.review import Review
+from app.models.review_category_rating import ReviewCategoryRating
+from app.models.review_daily_stats import ReviewDailyStats
+from app.schemas.review import TimeseriesPoint, TimeseriesResponse, TimeseriesSeries
+
+# Category value of the rows holding overall ratings
+OVERALL = ""
+
+# Dimensions a time series can be split by
+GROUP_BY_COLUMNS = {
+    "property": ReviewDailyStats.property_id,
+    "channel": ReviewDailyStats.channel,
+    "category": ReviewDailyStats.category,
+}
+
+KEY_COLUMNS = ("day", "property_id", "channel", "category")
+MEASURE_COLUMNS = ("review_count", "rating_sum", "rating_count")
+
+DailyKey = Tuple[date, str, str, str]
+
+
+def rollup_queries() -> List:
+    """SELECTs producing every review_daily_stats row from reviews"""
+    day = func.date(Review.submitted_at)
+    property_id = func.coalesce(Review.property_id, "")
+    channel = func.coalesce(Review.channel, "")
+
+    overall = (
+        select(
+            day,
+            property_id,
+            channel,
+            literal(OVERALL),
+            func.count(),
+            func.coalesce(func.sum(Review.average_rating), 0.0),
+            func.count(Review.average_rating),
+        )
+        .where(Review.submitted_at.is_not(None))
+        .group_by(day, property_id, channel)
+    )
+    categories = (
+        select(
+            day,
+            property_id,
+            channel,
+            ReviewCategoryRating.category,
+            func.count(),
+            func.sum(ReviewCategoryRating.rating),
+            func.count(ReviewCategoryRating.rating),
+        )
+        .join(Review, Review.id == ReviewCategoryRating.review_id)
+        .where(Review.submitted_at.is_not(None))
+        .group_by(day, property_id, channel, ReviewCategoryRating.category)
+    )
+    return [overall, categories]
+
+
+def rebuild_statements() -> List:
+    """Statements replacing review_daily_stats with a fresh aggregation"""
+    columns = [getattr(ReviewDailyStats, name) for name in KEY_COLUMNS + MEASURE_COLUMNS]
+    return [delete(ReviewDailyStats)] + [
+        insert(ReviewDailyStats).from_select(columns, query) for query in rollup_queries()
+    ]
+
+
+def upsert_statement(dialect):
+    """INSERT ... ON CONFLICT DO UPDATE adding the inserted measures to an existing row"""
+    table = ReviewDailyStats.__table__
+    stmt = dialect.insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=list(KEY_COLUMNS),
+        set_={name: table.c[name] + stmt.excluded[name] for name in MEASURE_COLUMNS},
+    )
+
+
+# Built once and run with one parameter set per row, so it compiles once per dialect
+UPSERTS = {"postgresql": upsert_statement(postgresql), "sqlite": upsert_statement(sqlite)}
+DELETE_EMPTY = delete(ReviewDailyStats.__table__).where(
+    *(ReviewDailyStats.__table__.c[name] == bindparam(name) for name in KEY_COLUMNS),
+    ReviewDailyStats.__table__.c.review_count == 0,
+)
+
+
+class DailyStatsService:
+    """Maintains review_daily_stats and answers time series queries from it"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+
+    async def apply_inserted(self, reviews: Iterable[Dict[str, Any]]) -> None:
+        """Add newly inserted review rows to their daily rollups"""
+        deltas: Dict[DailyKey, List[float]] = defaultdict(lambda: [0, 0.0, 0])
+        for review in reviews:
+            if review["submitted_at"] is None:
+                continue
+            day = review["submitted_at"].date()
+            prop_id = review["property_id"] or ""
+            channel = review["channel"] or ""
+
+            overall = deltas[(day, prop_id, channel, OVERALL)]
+            overall[0] += 1
+            if review["average_rating"] is not None:
+                overall[1] += review["average_rating"]
+                overall[2] += 1
+
+            for cat in review["review_categories"] or []:
+                category = deltas[(day, prop_id, channel, cat["category"])]
+                category[0] += 1
+                category[1] += float(cat["rating"])
+                category[2] += 1
+
+        await self._upsert(deltas)
+
+    async def apply_changes(
+        self, changes: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]]
+    ) -> None:
+        """
+        Apply edits given (existing review row, incoming row) pairs: the change
+        in effective rating and, when the categories changed, their ratings
+        """
+        deltas: Dict[DailyKey, List[float]] = defaultdict(lambda: [0, 0.0, 0])
+        for review, incoming in changes:
+            if review["submitted_at"] is None:
+                continue
+            day = review["submitted_at"].date()
+            prop_id = review["property_id"] or ""
+            channel = review["channel"] or ""
+
+            old_rating, new_rating = review["average_rating"], incoming["average_rating"]
+            if old_rating != new_rating:
+                overall = deltas[(day, prop_id, channel, OVERALL)]
+                overall[1] += (new_rating or 0.0) - (old_rating or 0.0)
+                overall[2] += (new_rating is not None) - (old_rating is not None)
+
+            if review["review_categories"] != incoming["review_categories"]:
+                edits = ((review["review_categories"], -1), (incoming["review_categories"], 1))
+                for categories, sign in edits:
+                    for cat in categories or []:
+                        category = deltas[(day, prop_id, channel, cat["category"])]
+                        category[0] += sign
+                        category[1] += sign * float(cat["rating"])
+                        category[2] += sign
+
+        await self._upsert(deltas)
+        # Categories a review no longer has can leave empty rows, which a rebuild would not
+        emptied = [
+            dict(zip(KEY_COLUMNS, key))
+            for key, measures in sorted(deltas.items())
+            if measures[0] < 0
+        ]
+        if emptied:
+            await self.db.execute(DELETE_EMPTY, emptied)
+
+    async def _upsert(self, deltas: Dict[DailyKey, List[float]]) -> None:
+        """Add each delta to its row, executemany-style"""
+        # Key order, so concurrent syncs lock shared rows in the same order
+        rows = [
+            dict(zip(KEY_COLUMNS + MEASURE_COLUMNS, key + tuple(measures)))
+            for key, measures in sorted(deltas.items())
+        ]
+        if rows:
+            dialect = "postgresql" if self.db.bind.dialect.name == "postgresql" else "sqlite"
+            await self.db.execute(UPSERTS[dialect], rows)
+
+    # ------------------------------------------------------------------
+    # Rebuild and consistency check
+    # ------------------------------------------------------------------
+
+    async def rebuild(self) -> None:
+        """Recompute review_daily_stats from reviews (the caller commits)"""
+        for stmt in rebuild_statements():
+            await self.db.execute(stmt)
+
+    async def check_consistency(self) -> List[str]:
+        """Compare stored daily rollups against a fresh aggregation, returns mismatches"""
+        expected: Dict[Tuple, Tuple] = {}
+        for query in rollup_queries():
+            for row in (await self.db.execute(query)).all():
+                expected[self._key(row[:4])] = tuple(row[4:])
+
+        stored = {
+            self._key(row[:4]): tuple(row[4:])
+            for row in (
+                await self.db.execute(
+                    select(
+                        *(getattr(ReviewDailyStats, name) for name in KEY_COLUMNS),
+                        *(getattr(ReviewDailyStats, name) for name in MEASURE_COLUMNS),
+                    )
+                )
+            ).all()
+        }
+
+        problems = []
+        for key in sorted(set(expected) | set(stored)):
+            want = expected.get(key, (0, 0.0, 0))
+            have = stored.get(key, (0, 0.0, 0))
+            if want[0] != have[0] or want[2] != have[2] or abs(want[1] - have[1]) > 1e-6:
+                problems.append(f"daily {'/'.join(key)}: {have!r}, expected {want!r}")
+        return problems
+
+    @staticmethod
+    def _key(values) -> Tuple[str, ...]:
+        # SQLite returns date() as text, PostgreSQL as a date
+        day, prop_id, channel, category = values
+        return (str(day), prop_id, channel, category)
+
+    # ------------------------------------------------------------------
+    # Time series
+    # ------------------------------------------------------------------
+
+    async def get_timeseries(
+        self,
+        interval: str = "week",
+        property_id: Optional[str] = None,
+        channel: Optional[str] = None,
+        category: Optional[str] = None,
+        group_by: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> TimeseriesResponse:
+        """
+        Review volume and average rating per day, week (from Monday) or month.
+
+        Without `category` (or group_by=category) the overall effective rating
+        is used; with it, that category's ratings.
+        """
+        filters = []
+        if group_by == "category":
+            filters.append(ReviewDailyStats.category != OVERALL)
+            if category:
+                filters.append(ReviewDailyStats.category == category)
+        else:
+            filters.append(ReviewDailyStats.category == (category or OVERALL))
+        if property_id:
+            filters.append(ReviewDailyStats.property_id == property_id)
+        if channel:
+            filters.append(ReviewDailyStats.channel == channel)
+        if start:
+            filters.append(ReviewDailyStats.day >= start)
+        if end:
+            filters.append(ReviewDailyStats.day <= end)
+
+        dimension = GROUP_BY_COLUMNS[group_by] if group_by else literal("all")
+        query = (
+            select(
+                ReviewDailyStats.day,
+                dimension,
+                func.sum(ReviewDailyStats.review_count),
+                func.sum(ReviewDailyStats.rating_sum),
+                func.sum(ReviewDailyStats.rating_count),
+            )
+            .where(*filters)
+            .group_by(ReviewDailyStats.day, dimension)
+        )
+        result = await self.db.execute(query)
+
+        buckets: Dict[str, Dict[date, List[float]]] = defaultdict(
+            lambda: defaultdict(lambda: [0, 0.0, 0])
+        )
+        for day, key, review_count, rating_sum, rating_count in result.all():
+            bucket = buckets[key][self.period_start(day, interval)]
+            bucket[0] += review_count
+            bucket[1] += rating_sum or 0.0
+            bucket[2] += rating_count
+
+        series = [
+            TimeseriesSeries(
+                key=key,
+                points=[
+                    TimeseriesPoint(
+                        period_start=period,
+                        review_count=review_count,
+                        average_rating=round(rating_sum / rating_count, 2)
+                        if rating_count
+                        else None,
+                    )
+                    for period, (review_count, rating_sum, rating_count) in sorted(
+                        periods.items()
+                    )
+                ],
+            )
+            for key, periods in sorted(buckets.items())
+        ]
+        return TimeseriesResponse(interval=interval, group_by=group_by, series=series)
+
+    @staticmethod
+    def period_start(day, interval: str) -> date:
+        """First day of the day/week/month bucket containing `day`"""
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        if interval == "week":
+            return day - timedelta(days=day.weekday())
+        if interval == "month":
+            return day.replace(day=1)
+        return day
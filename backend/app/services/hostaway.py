@@ -1,17 +1,124 @@
+import asyncio
+import time
 import httpx
-from typing import List, Dict, Any, Optional
+import ijson
+from ijson.common import ObjectBuilder
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, AsyncIterator
 from datetime import datetime
 from app.core.config import settings
+from app.core.metrics import HOSTAWAY_ERRORS, HOSTAWAY_REQUEST_DURATION
+from app.models.hostaway_account import HostawayAccount
 from app.schemas.review import ReviewNormalized, ReviewCategory
+from app.services.normalizer import normalize_reviews, parse_submitted_at, to_models
+
+# Status codes worth retrying with backoff
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Shared client, opened and closed by the application lifespan
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create a pooled HTTP/2 client for Hostaway with keep-alive connections"""
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=settings.HOSTAWAY_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.HOSTAWAY_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HOSTAWAY_MAX_CONNECTIONS,
+            keepalive_expiry=settings.HOSTAWAY_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    """Open the shared Hostaway client (called on startup)"""
+    global _http_client
+    if _http_client is None:
+        _http_client = create_http_client()
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared Hostaway client (called on shutdown)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+class RateLimiter:
+    """Token bucket limiting requests per second, shared by all requests of an account"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent"""
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._tokens = 1.0
+                self._updated = time.monotonic()
+            self._tokens -= 1
+
+
+# One limiter per account, so concurrent syncs and pages share its budget
+_rate_limiters: Dict[str, RateLimiter] = {}
+
+
+def rate_limiter_for(account_id: str, rate: Optional[float] = None) -> Optional[RateLimiter]:
+    """Shared limiter for an account, None when rate limiting is disabled"""
+    if rate is None:
+        rate = settings.HOSTAWAY_RATE_LIMIT_PER_SECOND
+    if rate <= 0:
+        return None
+
+    limiter = _rate_limiters.get(account_id)
+    if limiter is None or limiter.rate != rate:
+        limiter = RateLimiter(rate, burst=settings.HOSTAWAY_MAX_CONCURRENCY)
+        _rate_limiters[account_id] = limiter
+    return limiter
+
+
+def default_account() -> HostawayAccount:
+    """The account configured through HOSTAWAY_ACCOUNT_ID / HOSTAWAY_API_KEY"""
+    return HostawayAccount(
+        account_id=settings.HOSTAWAY_ACCOUNT_ID,
+        api_key=settings.HOSTAWAY_API_KEY,
+        name="default",
+        is_active=True,
+    )
 
 
 class HostawayService:
     """Service for interacting with Hostaway API"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        account: Optional[HostawayAccount] = None,
+    ):
+        account = account or default_account()
         self.base_url = settings.HOSTAWAY_BASE_URL
-        self.api_key = settings.HOSTAWAY_API_KEY
-        self.account_id = settings.HOSTAWAY_ACCOUNT_ID
+        self.api_key = account.api_key
+        self.account_id = account.account_id
+        self.rate_limiter = rate_limiter_for(account.account_id, account.rate_limit_per_second)
+        self.client = client
+        self.page_size = settings.HOSTAWAY_PAGE_SIZE
+        self.max_concurrency = settings.HOSTAWAY_MAX_CONCURRENCY
+        # Set when the API was unreachable and mock data was served instead
+        self.used_mock_data = False
+        # Pages fully received so far, for sync progress reporting
+        self.pages_fetched = 0
 
     def _get_headers(self) -> Dict[str, str]:
         """Get API headers"""
@@ -20,23 +127,254 @@ class HostawayService:
             "Content-Type": "application/json",
         }
 
-    async def fetch_reviews(self) -> Dict[str, Any]:
-        """Fetch reviews from Hostaway API"""
+    @asynccontextmanager
+    async def _client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Use the injected or shared client, or a temporary one outside the app"""
+        client = self.client or _http_client
+        if client is not None:
+            yield client
+            return
+
+        async with create_http_client() as client:
+            yield client
+
+    async def _stream_page(
+        self,
+        client: httpx.AsyncClient,
+        offset: int,
+        meta: Dict[str, Any],
+        newest_first: bool = False,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream one page of reviews, yielding chunks as the JSON body is parsed.
+
+        Retries 429/5xx and transport errors with backoff as long as nothing has
+        been yielded yet. Top-level fields (status, count) are stored in `meta`.
+        """
         url = f"{self.base_url}/reviews"
+        params = {"limit": self.page_size, "offset": offset}
+        if newest_first:
+            params.update(sortBy="submittedAt", sortOrder="desc")
+
+        yielded = False
+        for attempt in range(settings.HOSTAWAY_MAX_RETRIES + 1):
+            retries_left = attempt < settings.HOSTAWAY_MAX_RETRIES
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            started = time.perf_counter()
+            outcome = "transport_error"
+            try:
+                async with client.stream(
+                    "GET", url, headers=self._get_headers(), params=params
+                ) as response:
+                    outcome = str(response.status_code)
+                    if response.status_code in RETRYABLE_STATUS_CODES and retries_left:
+                        delay = self._retry_delay(attempt, response)
+                    else:
+                        response.raise_for_status()
+                        async for chunk in self._parse_reviews(response, meta):
+                            yielded = True
+                            yield chunk
+                        self.pages_fetched += 1
+                        return
+            except httpx.TransportError:
+                outcome = "transport_error"
+                if yielded or not retries_left:
+                    raise
+                delay = self._retry_delay(attempt)
+            finally:
+                # Covers the streamed body too; a consumer that stops early ends it here
+                HOSTAWAY_REQUEST_DURATION.observe(time.perf_counter() - started, outcome=outcome)
+                if outcome != "200":
+                    HOSTAWAY_ERRORS.inc(reason=outcome)
+
+            await asyncio.sleep(delay)
 
-        async with httpx.AsyncClient() as client:
+    async def _parse_reviews(
+        self, response: httpx.Response, meta: Dict[str, Any]
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Incrementally parse `result` items out of a streamed Hostaway response"""
+        events = ijson.sendable_list()
+        parser = ijson.parse_coro(events, use_float=True)
+        builder: Optional[ObjectBuilder] = None
+        chunk: List[Dict[str, Any]] = []
+
+        def feed(data: bytes):
+            nonlocal builder
+            if data:
+                parser.send(data)
+            else:
+                parser.close()
+
+            for prefix, event, value in events:
+                if builder is not None:
+                    builder.event(event, value)
+                    if prefix == "result.item" and event == "end_map":
+                        chunk.append(builder.value)
+                        builder = None
+                elif prefix == "result.item" and event == "start_map":
+                    builder = ObjectBuilder()
+                    builder.event(event, value)
+                elif prefix in ("status", "count"):
+                    meta[prefix] = value
+            del events[:]
+
+        async for data in response.aiter_bytes():
+            feed(data)
+            if len(chunk) >= self.page_size:
+                yield chunk
+                chunk = []
+        feed(b"")
+
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Exponential backoff, honouring Retry-After when Hostaway sends it"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+        return settings.HOSTAWAY_RETRY_BACKOFF * (2**attempt)
+
+    async def iter_review_pages(
+        self, since: Optional[datetime] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield chunks of raw reviews (at most one page each) as they are parsed.
+
+        Without `since` every page is fetched with bounded concurrency. With `since`
+        pages are requested newest first, one at a time, and paging stops at the
+        first page reaching reviews submitted before `since`.
+        """
+        async with self._client() as client:
+            if since is not None:
+                async for chunk in self._iter_pages_since(client, since):
+                    yield chunk
+                return
+
+            meta: Dict[str, Any] = {}
+            received = 0
+            async for chunk in self._stream_first_page(client, meta):
+                received += len(chunk)
+                yield chunk
+            if meta.get("status") != "success" or received < self.page_size:
+                return
+
+            total = meta.get("count")
+            if total is None:
+                # Total unknown: walk pages one at a time until a short page
+                offset = self.page_size
+                while True:
+                    received = 0
+                    async for chunk in self._stream_page(client, offset, {}):
+                        received += len(chunk)
+                        yield chunk
+                    if received < self.page_size:
+                        return
+                    offset += self.page_size
+
+            offsets = list(range(self.page_size, int(total), self.page_size))
+            async for chunk in self._fetch_pages_concurrently(client, offsets):
+                yield chunk
+
+    async def _stream_first_page(
+        self, client: httpx.AsyncClient, meta: Dict[str, Any], newest_first: bool = False
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream the first page, falling back to mock data if Hostaway is unreachable"""
+        yielded = False
+        try:
+            async for chunk in self._stream_page(client, 0, meta, newest_first):
+                yielded = True
+                yield chunk
+        except httpx.HTTPError as e:
+            if yielded:
+                raise
+            print(f"Error fetching reviews from Hostaway: {e}")
+            # Return mock data if API fails (sandbox has no data)
+            mock_data = self._get_mock_data()
+            self.used_mock_data = True
+            self.pages_fetched += 1
+            meta["status"] = mock_data["status"]
+            yield mock_data["result"]
+
+    async def _iter_pages_since(
+        self, client: httpx.AsyncClient, since: datetime
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Walk newest-first pages sequentially, keeping reviews submitted at or after `since`"""
+        offset = 0
+        while True:
+            meta: Dict[str, Any] = {}
+            if offset == 0:
+                chunks = self._stream_first_page(client, meta, newest_first=True)
+            else:
+                chunks = self._stream_page(client, offset, meta, newest_first=True)
+
+            received = 0
+            reached_older = False
+            async for chunk in chunks:
+                received += len(chunk)
+                newer = [r for r in chunk if self._parse_submitted_at(r) >= since]
+                reached_older = reached_older or len(newer) < len(chunk)
+                if newer:
+                    yield newer
+
+            if reached_older or received < self.page_size or meta.get("status") != "success":
+                return
+            offset += self.page_size
+
+    @staticmethod
+    def _parse_submitted_at(review_data: Dict[str, Any]) -> datetime:
+        return parse_submitted_at(review_data.get("submittedAt", ""))
+
+    async def _fetch_pages_concurrently(
+        self, client: httpx.AsyncClient, offsets: List[int]
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Fetch the given offsets with a fixed pool of workers, yielding in arrival order"""
+        done = object()
+        pending: asyncio.Queue = asyncio.Queue()
+        for offset in offsets:
+            pending.put_nowait(offset)
+        # Bounded so parsed chunks cannot pile up ahead of a slow consumer
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency)
+
+        async def worker():
             try:
-                response = await client.get(
-                    url,
-                    headers=self._get_headers(),
-                    timeout=30.0,
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError as e:
-                print(f"Error fetching reviews from Hostaway: {e}")
-                # Return mock data if API fails (sandbox has no data)
-                return self._get_mock_data()
+                while not pending.empty():
+                    offset = pending.get_nowait()
+                    async for chunk in self._stream_page(client, offset, {}):
+                        await chunks.put(chunk)
+            except Exception as e:
+                await chunks.put(e)
+            await chunks.put(done)
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(self.max_concurrency, len(offsets)))
+        ]
+        remaining = len(workers)
+        try:
+            while remaining:
+                item = await chunks.get()
+                if item is done:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                elif item:
+                    yield item
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def fetch_reviews(self) -> Dict[str, Any]:
+        """Fetch all reviews from Hostaway API"""
+        reviews: List[Dict[str, Any]] = []
+        async for page in self.iter_review_pages():
+            reviews.extend(page)
+
+        return {"status": "success", "result": reviews}
 
     def _get_mock_data(self) -> Dict[str, Any]:
         """Return mock review data for development - expanded dataset"""
@@ -759,7 +1097,12 @@ class HostawayService:
         }
 
     def _normalize_review(self, review_data: Dict[str, Any]) -> ReviewNormalized:
-        """Normalize Hostaway review data to internal format"""
+        """
+        Normalize Hostaway review data to internal format.
+
+        Reference implementation; the fetch pipeline uses the batch normalizer in
+        app.services.normalizer, which must produce identical output.
+        """
 
         # Parse categories
         categories = [
@@ -781,9 +1124,14 @@ class HostawayService:
             review_data.get("submittedAt", ""), "%Y-%m-%d %H:%M:%S"
         )
 
+        # Mock reviews carry no listingMapId; use the review ID as listing ID for mock
+        listing_map_id = review_data.get("listingMapId")
+
         return ReviewNormalized(
             id=str(review_data.get("id")),
-            listing_id=str(review_data.get("id")),  # Using review ID as listing ID for mock
+            listing_id=str(
+                listing_map_id if listing_map_id is not None else review_data.get("id")
+            ),
             listing_name=listing_name,
             property_id=property_id,
             review_type=review_data.get("type", "guest-to-host"),
@@ -799,12 +1147,24 @@ class HostawayService:
             is_featured=False,
         )
 
-    async def fetch_and_normalize_reviews(self) -> List[ReviewNormalized]:
-        """Fetch and normalize reviews from Hostaway API"""
-        data = await self.fetch_reviews()
+    async def iter_normalized_rows(
+        self, since: Optional[datetime] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Normalize reviews to plain dicts page by page, skipping model construction"""
+        async for page in self.iter_review_pages(since=since):
+            for row in normalize_reviews(page):
+                yield row
 
-        if data.get("status") == "success":
-            reviews = data.get("result", [])
-            return [self._normalize_review(review) for review in reviews]
+    async def iter_normalized_reviews(
+        self, since: Optional[datetime] = None
+    ) -> AsyncIterator[ReviewNormalized]:
+        """Normalize reviews page by page while later pages are still in flight"""
+        async for page in self.iter_review_pages(since=since):
+            for review in to_models(normalize_reviews(page)):
+                yield review
 
-        return []
+    async def fetch_and_normalize_reviews(
+        self, since: Optional[datetime] = None
+    ) -> List[ReviewNormalized]:
+        """Fetch and normalize reviews from Hostaway API"""
+        return [review async for review in self.iter_normalized_reviews(since=since)]
@@ -0,0 +1,135 @@
+"""
+Listings dimension maintained by the sync.
+
+Reviews reference a listings row by integer id instead of repeating the
+listing name, so renaming a listing updates one row and enumerating
+properties scans the small listings table rather than every review.
+Reviews also store their listing's property_id for filtering, so when a
+listing moves to another property its reviews are moved in the same
+transaction.
+"""
+from typing import Any, Dict, Iterable, Set, Tuple
+
+from sqlalchemy import select, tuple_, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.listing import Listing
+from app.models.review import Review
+
+# (account_id, external_id)
+ListingKey = Tuple[str, str]
+
+
+def listing_row(review: Dict[str, Any]) -> Dict[str, Any]:
+    """listings row for a normalized review"""
+    # Without listingMapId the normalized listing_id is the review ID, so key by name
+    has_listing_id = review["listing_id"] != review["id"]
+    return {
+        "account_id": review.get("account_id") or settings.HOSTAWAY_ACCOUNT_ID,
+        "external_id": review["listing_id"] if has_listing_id else review["listing_name"],
+        "name": review["listing_name"],
+        "property_id": review["property_id"],
+    }
+
+
+def listing_key(row: Dict[str, Any]) -> ListingKey:
+    return row["account_id"], row["external_id"]
+
+
+class ListingService:
+    """Upserts the listings of synced reviews and remembers their ids"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        # Listings already written by this sync: key -> (id, name, property_id)
+        self._known: Dict[ListingKey, Tuple[int, str, str]] = {}
+        # Properties of listings added or renamed by the last resolve(), old and new
+        self.changed_properties: Set[str] = set()
+        # Listings added or renamed by the last resolve()
+        self.written = 0
+        # Listings moved to another property during this sync
+        self.moved_listings: Set[int] = set()
+        # Reviews moved along with them by the last resolve()
+        self.moved_reviews = 0
+
+    async def resolve(self, rows: Iterable[Dict[str, Any]]) -> Dict[ListingKey, int]:
+        """
+        Insert new listings and rename changed ones (later rows win), moving the
+        reviews of listings whose property changed, returns listings.id for
+        every key. Listings seen earlier in the sync cost nothing.
+        """
+        latest = {listing_key(row): row for row in rows}
+        self.changed_properties = set()
+        self.written = 0
+        self.moved_reviews = 0
+        pending = [
+            row
+            for key, row in latest.items()
+            if self._known.get(key, (None,))[1:] != (row["name"], row["property_id"])
+        ]
+
+        if pending:
+            # Stored listings and their current property, before the upsert changes it
+            result = await self.db.execute(
+                select(
+                    Listing.id, Listing.account_id, Listing.external_id, Listing.property_id
+                ).where(
+                    tuple_(Listing.account_id, Listing.external_id).in_(
+                        [listing_key(row) for row in pending]
+                    )
+                )
+            )
+            stored = {
+                (account_id, external_id): (listing_id, property_id)
+                for listing_id, account_id, external_id, property_id in result.all()
+            }
+
+            dialect = postgresql if self.db.bind.dialect.name == "postgresql" else sqlite
+            stmt = dialect.insert(Listing).values(pending)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Listing.account_id, Listing.external_id],
+                set_={"name": stmt.excluded.name, "property_id": stmt.excluded.property_id},
+                where=or_(
+                    Listing.name != stmt.excluded.name,
+                    Listing.property_id != stmt.excluded.property_id,
+                ),
+            )
+            result = await self.db.execute(stmt.returning(Listing.property_id))
+            written = result.scalars().all()
+            self.written = len(written)
+            self.changed_properties.update(written)
+
+            for key, (listing_id, old_property_id) in stored.items():
+                new_property_id = latest[key]["property_id"]
+                if new_property_id == old_property_id:
+                    continue
+                result = await self.db.execute(
+                    update(Review)
+                    .where(Review.listing_ref_id == listing_id)
+                    .values(property_id=new_property_id)
+                    .execution_options(synchronize_session=False)
+                )
+                self.moved_listings.add(listing_id)
+                self.moved_reviews += result.rowcount
+                self.changed_properties.update((old_property_id, new_property_id))
+
+            # New listings are not known yet, so read their ids back
+            new_keys = [listing_key(row) for row in pending if listing_key(row) not in stored]
+            if new_keys:
+                result = await self.db.execute(
+                    select(Listing.id, Listing.account_id, Listing.external_id).where(
+                        tuple_(Listing.account_id, Listing.external_id).in_(new_keys)
+                    )
+                )
+                stored.update(
+                    ((account_id, external_id), (listing_id, None))
+                    for listing_id, account_id, external_id in result.all()
+                )
+
+            for key, (listing_id, _) in stored.items():
+                row = latest[key]
+                self._known[key] = (listing_id, row["name"], row["property_id"])
+
+        return {key: self._known[key][0] for key in latest}
@@ -0,0 +1,121 @@
+"""
+Bulk approve/feature actions.
+
+A bulk update locks and reads the targeted reviews once (for per-review
+outcomes and rollup deltas), updates by primary key exactly the rows read that
+differ (one UPDATE per SYNC_BATCH_SIZE IDs), adjusts the property rollups,
+re-renders the public feeds of the affected properties and commits, all in one
+transaction. Caches are invalidated once per request rather than once per review.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import REVIEWS_UNSCOPED, STATS, property_namespace, response_cache
+from app.core.config import settings
+from app.models.review import Review
+from app.schemas.review import BulkUpdateOutcome, BulkUpdateResponse, ReviewFilter
+from app.services.public_feed import PublicFeedService
+from app.services.review_queries import review_filters
+from app.services.stats import StatsService
+
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+NOT_FOUND = "not_found"
+
+
+class ModerationService:
+    """Applies approval/featured changes to many reviews at once"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.stats = StatsService(db)
+        self.public_feeds = PublicFeedService(db)
+
+    async def bulk_update(
+        self,
+        values: Dict[str, bool],
+        ids: Optional[List[str]] = None,
+        review_filter: Optional[ReviewFilter] = None,
+    ) -> BulkUpdateResponse:
+        """Set `values` (is_approved/is_featured) on the given external IDs or filter matches"""
+        if ids is not None:
+            target = [Review.external_id.in_(ids)]
+        else:
+            target = review_filters(**review_filter.model_dump())
+
+        # Lock the targeted rows so outcomes and rollup deltas match what the
+        # UPDATE changes (SQLite ignores FOR UPDATE; its writes are serialized)
+        result = await self.db.execute(
+            select(
+                Review.id,
+                Review.external_id,
+                Review.property_id,
+                Review.is_approved,
+                Review.is_featured,
+            )
+            .where(*target)
+            .with_for_update()
+        )
+        rows = result.all()
+
+        outcomes: Dict[str, str] = {}
+        changed_ids: List[int] = []
+        deltas: Dict[Optional[str], List[int]] = defaultdict(lambda: [0, 0])
+        for row in rows:
+            current = {"is_approved": bool(row.is_approved), "is_featured": bool(row.is_featured)}
+            if all(current[field] == value for field, value in values.items()):
+                outcomes[row.external_id] = UNCHANGED
+                continue
+            outcomes[row.external_id] = UPDATED
+            changed_ids.append(row.id)
+            delta = deltas[row.property_id]
+            if "is_approved" in values:
+                delta[0] += int(values["is_approved"]) - int(current["is_approved"])
+            if "is_featured" in values:
+                delta[1] += int(values["is_featured"]) - int(current["is_featured"])
+
+        updated = len(changed_ids)
+        if updated:
+            # Exactly the locked rows that differ; NULL flags count as False, as above
+            differs = [
+                func.coalesce(getattr(Review, field), False) != value
+                for field, value in values.items()
+            ]
+            for start in range(0, updated, settings.SYNC_BATCH_SIZE):
+                await self.db.execute(
+                    update(Review)
+                    .where(
+                        Review.id.in_(changed_ids[start : start + settings.SYNC_BATCH_SIZE]),
+                        or_(*differs),
+                    )
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+            for property_id, (approved_delta, featured_delta) in deltas.items():
+                await self.stats.apply_moderation(property_id, approved_delta, featured_delta)
+            await self.public_feeds.regenerate(deltas)
+        await self.db.commit()
+
+        if updated:
+            await response_cache.invalidate(
+                REVIEWS_UNSCOPED,
+                *(property_namespace(property_id) for property_id in deltas),
+                STATS,
+            )
+
+        if ids is not None:
+            # In request order, once per ID
+            results = [
+                BulkUpdateOutcome(id=review_id, outcome=outcomes.get(review_id, NOT_FOUND))
+                for review_id in dict.fromkeys(ids)
+            ]
+        else:
+            results = [
+                BulkUpdateOutcome(id=review_id, outcome=outcome)
+                for review_id, outcome in outcomes.items()
+            ]
+
+        return BulkUpdateResponse(matched=len(rows), updated=updated, results=results)
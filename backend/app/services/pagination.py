@@ -0,0 +1,36 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from sqlalchemy import tuple_
+
+from app.models.review import Review
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(submitted_at: datetime, review_id: int) -> str:
+    """Encode the position after a review as an opaque URL-safe cursor"""
+    payload = json.dumps({"s": submitted_at.isoformat(), "i": review_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["s"]), int(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+
+def after_cursor(cursor: str):
+    """
+    Filter selecting reviews after the cursor in (submitted_at DESC, id DESC) order,
+    so each page is an index seek rather than an OFFSET scan.
+    """
+    submitted_at, review_id = decode_cursor(cursor)
+    return tuple_(Review.submitted_at, Review.id) < tuple_(submitted_at, review_id)
@@ -0,0 +1,145 @@
+"""
+Pre-rendered public review feeds.
+
+Guest pages only show a property's approved reviews, featured first. Each
+property's feed is rendered once, gzip-compressed and stored in public_feeds
+in the same transaction as the moderation change or sync batch that touched
+the property, so serving it is a primary-key lookup returning stored bytes
+that a CDN can cache.
+"""
+import gzip
+from datetime import datetime
+from typing import Iterable, Optional
+
+import orjson
+from sqlalchemy import select, func, case, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import make_etag
+from app.core.config import settings
+from app.models.listing import Listing
+from app.models.public_feed import PublicFeed
+from app.models.review import Review
+from app.services.review_serializer import review_row_to_dict, select_listing_rows
+
+
+def compress(body: bytes) -> bytes:
+    """gzip with a fixed mtime, so identical feeds compress to identical bytes"""
+    return gzip.compress(body, mtime=0)
+
+
+class PublicFeedService:
+    """Renders, stores and looks up the public review feed of each property"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, property_id: str) -> Optional[PublicFeed]:
+        return await self.db.get(PublicFeed, property_id)
+
+    async def last_modified(self, property_id: str) -> Optional[datetime]:
+        """Latest change to a property's reviews or listings, None if it has no reviews"""
+        reviews_at = await self.db.scalar(
+            select(func.max(Review.updated_at)).where(Review.property_id == property_id)
+        )
+        if reviews_at is None:
+            return None
+        listings_at = await self.db.scalar(
+            select(func.max(Listing.updated_at)).where(Listing.property_id == property_id)
+        )
+        return max(reviews_at, listings_at or reviews_at)
+
+    async def render(self, property_id: str, generated_at: datetime) -> Optional[bytes]:
+        """PublicReviewFeed JSON for a property, None if it has no reviews at all"""
+        approved = Review.is_approved.is_(True)
+        total, approved_count, average_rating, featured_count = (
+            await self.db.execute(
+                select(
+                    func.count(Review.id),
+                    func.coalesce(func.sum(case((approved, 1), else_=0)), 0),
+                    func.avg(case((approved, Review.average_rating))),
+                    func.coalesce(
+                        func.sum(case((approved & Review.is_featured.is_(True), 1), else_=0)), 0
+                    ),
+                ).where(Review.property_id == property_id)
+            )
+        ).one()
+        if not total:
+            return None
+
+        rows = []
+        if approved_count:
+            result = await self.db.execute(
+                select_listing_rows()
+                .where(Review.property_id == property_id, approved)
+                .order_by(
+                    func.coalesce(Review.is_featured, False).desc(),
+                    Review.submitted_at.desc(),
+                    Review.id.desc(),
+                )
+                .limit(settings.PUBLIC_FEED_MAX_REVIEWS)
+            )
+            rows = result.all()
+        listing_name = await self.db.scalar(
+            select(func.max(Listing.name)).where(Listing.property_id == property_id)
+        )
+
+        return orjson.dumps(
+            {
+                "property_id": property_id,
+                "listing_name": listing_name,
+                "total_reviews": int(approved_count),
+                "average_rating": round(average_rating, 2) if average_rating is not None else None,
+                "featured_count": int(featured_count),
+                "reviews": [review_row_to_dict(row) for row in rows],
+                "generated_at": generated_at,
+            }
+        )
+
+    async def regenerate(self, property_ids: Iterable[Optional[str]]) -> int:
+        """Re-render and store the feeds of the given properties (the caller commits)"""
+        count = 0
+        for property_id in {property_id for property_id in property_ids if property_id}:
+            generated_at = datetime.utcnow()
+            body = await self.render(property_id, generated_at)
+            if body is None:
+                await self.db.execute(
+                    delete(PublicFeed).where(PublicFeed.property_id == property_id)
+                )
+                continue
+
+            feed = {
+                "property_id": property_id,
+                "body": compress(body),
+                "etag": make_etag(body),
+                "generated_at": generated_at,
+            }
+            dialect = postgresql if self.db.bind.dialect.name == "postgresql" else sqlite
+            stmt = dialect.insert(PublicFeed).values(feed)
+            await self.db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[PublicFeed.property_id],
+                    set_={name: stmt.excluded[name] for name in feed if name != "property_id"},
+                )
+            )
+            count += 1
+        return count
+
+    async def rebuild(self) -> int:
+        """Regenerate every feed and drop those of properties without reviews"""
+        result = await self.db.execute(select(Listing.property_id).distinct())
+        property_ids = list(result.scalars().all())
+        await self.db.execute(delete(PublicFeed).where(PublicFeed.property_id.not_in(property_ids)))
+        count = await self.regenerate(property_ids)
+        await self.db.commit()
+        return count
+
+    async def rebuild_if_empty(self) -> bool:
+        """Populate public_feeds on first start against an existing database"""
+        if await self.db.scalar(select(func.count()).select_from(PublicFeed)):
+            return False
+        if not await self.db.scalar(select(func.count(Review.id))):
+            return False
+        await self.rebuild()
+        return True
@@ -0,0 +1,36 @@
+from typing import List, Optional
+from sqlalchemy import Select
+
+from app.models.review import Review
+
+
+def review_filters(
+    property_id: Optional[str] = None,
+    channel: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    is_approved: Optional[bool] = None,
+) -> List:
+    """Build the WHERE clauses shared by review listing queries"""
+    filters = []
+    if property_id:
+        filters.append(Review.property_id == property_id)
+    if channel:
+        filters.append(Review.channel == channel)
+    if min_rating is not None:
+        # Effective rating, so category-only reviews are not filtered out
+        filters.append(Review.average_rating >= min_rating)
+    if is_approved is not None:
+        filters.append(Review.is_approved == is_approved)
+    return filters
+
+
+def newest_first(query: Select) -> Select:
+    """Order reviews newest first, with id as tie-breaker for stable keyset pages"""
+    return query.order_by(Review.submitted_at.desc(), Review.id.desc())
+
+
+def by_rating(query: Select, descending: bool = True) -> Select:
+    """Order reviews by effective rating, unrated reviews last, id as tie-breaker"""
+    if descending:
+        return query.order_by(Review.average_rating.desc().nulls_last(), Review.id.desc())
+    return query.order_by(Review.average_rating.asc().nulls_last(), Review.id.asc())
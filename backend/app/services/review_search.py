@@ -0,0 +1,152 @@
+"""
+Full-text search over review text.
+
+PostgreSQL keeps a stored tsvector column (generated from public_review) with
+a GIN index; SQLite keeps an external-content FTS5 table maintained by
+triggers. Either way the database updates the index on every insert, update
+and delete of a review, including those made by /sync, so nothing in the
+write paths has to know about it.
+
+Snippets are safe to insert as HTML: the database wraps matches in control
+character sentinels, highlight() escapes the text and only then turns the
+sentinels into <mark> tags.
+"""
+import html
+import re
+from typing import Optional
+
+from sqlalchemy import Select, false, func, literal_column
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import column, table
+
+from app.models.review import Review
+
+# Text search configuration (PostgreSQL) and tokenizer (SQLite), both stemming English
+SEARCH_CONFIG = "english"
+FTS5_TOKENIZER = "porter unicode61"
+
+# Sentinels the database puts around matched terms, then the tags highlight() puts there
+SNIPPET_START = "\x02"
+SNIPPET_STOP = "\x03"
+MARK_START = "<mark>"
+MARK_STOP = "</mark>"
+SNIPPET_WORDS = 16
+
+reviews_fts = table("reviews_fts", column("rowid"), column("public_review"))
+
+POSTGRES_INDEX_DDL = [
+    f"""
+    ALTER TABLE reviews ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}', coalesce(public_review, ''))) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_reviews_fts ON reviews USING GIN (search_vector)",
+]
+
+SQLITE_INDEX_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(
+        public_review, content='reviews', content_rowid='id', tokenize='{FTS5_TOKENIZER}'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_insert AFTER INSERT ON reviews BEGIN
+        INSERT INTO reviews_fts(rowid, public_review) VALUES (new.id, new.public_review);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_delete AFTER DELETE ON reviews BEGIN
+        INSERT INTO reviews_fts(reviews_fts, rowid, public_review)
+        VALUES ('delete', old.id, old.public_review);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_update AFTER UPDATE OF public_review ON reviews
+    BEGIN
+        INSERT INTO reviews_fts(reviews_fts, rowid, public_review)
+        VALUES ('delete', old.id, old.public_review);
+        INSERT INTO reviews_fts(rowid, public_review) VALUES (new.id, new.public_review);
+    END
+    """,
+    # Index the reviews that existed before the table
+    "INSERT INTO reviews_fts(reviews_fts) VALUES ('rebuild')",
+]
+
+
+def create_search_index(conn: Connection) -> None:
+    """Create the text index and index existing reviews (idempotent)"""
+    ddl = POSTGRES_INDEX_DDL if conn.dialect.name == "postgresql" else SQLITE_INDEX_DDL
+    for statement in ddl:
+        conn.exec_driver_sql(statement)
+
+
+def highlight(snippet: Optional[str]) -> Optional[str]:
+    """
+    HTML-escape a database snippet and turn its sentinels into <mark> tags.
+    A sentinel already in the review text also becomes a tag, which is still
+    well-formed, inert HTML.
+    """
+    if snippet is None:
+        return None
+    return (
+        html.escape(snippet)
+        .replace(SNIPPET_START, MARK_START)
+        .replace(SNIPPET_STOP, MARK_STOP)
+    )
+
+
+def fts5_query(q: str) -> Optional[str]:
+    """
+    Quote each word of a search box query so FTS5 treats it as plain terms
+    (all must match, like websearch_to_tsquery), None if it has no words.
+    """
+    terms = re.findall(r"\w+", q)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"' for term in terms)
+
+
+class ReviewSearch:
+    """Match, rank and snippet expressions for one search query"""
+
+    def __init__(self, q: str, dialect_name: str):
+        self.postgres = dialect_name == "postgresql"
+
+        if self.postgres:
+            # Inlined so the driver never has to guess the regconfig parameter type
+            config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+            vector = literal_column("reviews.search_vector")
+            tsquery = func.websearch_to_tsquery(config, q)
+            self.match = vector.op("@@")(tsquery)
+            self.rank = func.ts_rank_cd(vector, tsquery)
+            self.snippet = func.ts_headline(
+                config,
+                Review.public_review,
+                tsquery,
+                f'StartSel="{SNIPPET_START}", StopSel="{SNIPPET_STOP}", '
+                f"MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}",
+            )
+        else:
+            fts = literal_column("reviews_fts")
+            terms = fts5_query(q)
+            self.match = fts.op("MATCH")(terms) if terms else false()
+            # bm25() is lower for better matches
+            self.rank = -func.bm25(fts)
+            self.snippet = func.snippet(
+                fts, 0, SNIPPET_START, SNIPPET_STOP, "…", SNIPPET_WORDS
+            )
+
+    def apply(self, query: Select) -> Select:
+        """Restrict a reviews query to matching reviews"""
+        if not self.postgres:
+            query = query.join(reviews_fts, reviews_fts.c.rowid == Review.id)
+        return query.where(self.match)
+
+    def columns(self):
+        """Rank and snippet, labelled for review_row_to_dict"""
+        return self.rank.label("search_rank"), self.snippet.label("search_snippet")
+
+    def by_relevance(self, query: Select) -> Select:
+        """Order best matches first, newest first among equal ranks"""
+        return query.order_by(
+            self.rank.desc(), Review.submitted_at.desc(), Review.id.desc()
+        )
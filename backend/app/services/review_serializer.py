@@ -0,0 +1,89 @@
+"""
+Lean serialization for review listings.
+
+Listing queries select only the columns the response needs, rows are mapped to
+plain dicts and dumped straight to JSON bytes with orjson, skipping ORM
+hydration and per-review pydantic models. The bytes match
+ReviewResponse.model_dump_json() for the same reviews (ReviewSearchResponse
+when the rows carry search_rank/search_snippet).
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+import orjson
+from sqlalchemy import Select, select
+
+from app.models.listing import Listing
+from app.models.review import Review
+from app.services.review_search import highlight
+
+# Columns read for a listing; Review.id is only used for keyset cursors
+LISTING_COLUMNS = (
+    Review.id,
+    Review.external_id,
+    Review.listing_id,
+    Listing.name.label("listing_name"),
+    Review.property_id,
+    Review.review_type,
+    Review.status,
+    Review.rating,
+    Review.average_rating,
+    Review.public_review,
+    Review.review_categories,
+    Review.guest_name,
+    Review.channel,
+    Review.submitted_at,
+    Review.is_approved,
+    Review.is_featured,
+)
+
+
+def select_listing_rows() -> Select:
+    """SELECT of LISTING_COLUMNS, joining each review to its listing for the name"""
+    return select(*LISTING_COLUMNS).outerjoin_from(
+        Review, Listing, Listing.id == Review.listing_ref_id
+    )
+
+
+def review_row_to_dict(row) -> Dict[str, Any]:
+    """Map a LISTING_COLUMNS row to a dict shaped like ReviewNormalized"""
+    categories = [
+        {"category": cat["category"], "rating": float(cat["rating"])}
+        for cat in row.review_categories or []
+    ]
+
+    review = {
+        "id": str(row.external_id),
+        "listing_id": row.listing_id,
+        "listing_name": row.listing_name,
+        "property_id": row.property_id,
+        "review_type": row.review_type,
+        "status": row.status,
+        "rating": row.rating,
+        "average_rating": row.average_rating,  # Stored at write time
+        "public_review": row.public_review,
+        "review_categories": categories,
+        "guest_name": row.guest_name,
+        "channel": row.channel,
+        "submitted_at": row.submitted_at,
+        "is_approved": bool(row.is_approved),
+        "is_featured": bool(row.is_featured),
+    }
+    if "search_rank" in row._mapping:
+        review["rank"] = round(row.search_rank, 6)
+        review["snippet"] = highlight(row.search_snippet)
+    return review
+
+
+def dump_review_response(
+    rows: Sequence, total: Optional[int] = None, next_cursor: Optional[str] = None
+) -> bytes:
+    """Serialize listing rows as a ReviewResponse body"""
+    data: List[Dict[str, Any]] = [review_row_to_dict(row) for row in rows]
+    return orjson.dumps(
+        {
+            "status": "success",
+            "total": total if total is not None else len(data),
+            "data": data,
+            "next_cursor": next_cursor,
+        }
+    )
@@ -0,0 +1,112 @@
+"""
+Stale-while-revalidate snapshot of the normalized Hostaway reviews.
+
+GET /api/reviews/hostaway is served from the last snapshot (memory, then disk)
+immediately. When the snapshot is older than HOSTAWAY_SNAPSHOT_TTL_SECONDS a
+single background refresh is started; concurrent requests share it instead of
+issuing parallel upstream fetches.
+"""
+import asyncio
+import os
+import tempfile
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.schemas.review import ReviewResponse
+from app.services.hostaway import HostawayService
+
+
+class Snapshot:
+    """Serialized response body plus the wall-clock time it was fetched"""
+
+    def __init__(self, body: bytes, fetched_at: float):
+        self.body = body
+        self.fetched_at = fetched_at
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.fetched_at)
+
+
+class HostawaySnapshotService:
+    """Keeps the latest Hostaway snapshot and refreshes it with single-flight"""
+
+    def __init__(self, path: str, ttl: int):
+        self.path = path
+        self.ttl = ttl
+        self._snapshot: Optional[Snapshot] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def get(self) -> Snapshot:
+        """Return the current snapshot, refreshing in the background when stale"""
+        if self._snapshot is None:
+            self._snapshot = await asyncio.to_thread(self._load_from_disk)
+
+        if self._snapshot is None:
+            # Nothing to serve yet: the first caller waits, the rest join it
+            return await self.refresh()
+
+        if self._snapshot.age > self.ttl:
+            self._start_refresh()
+        return self._snapshot
+
+    async def refresh(self) -> Snapshot:
+        """Fetch a new snapshot, joining an in-flight fetch if there is one"""
+        return await asyncio.shield(self._start_refresh())
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._fetch())
+            self._refresh_task.add_done_callback(self._log_failure)
+        return self._refresh_task
+
+    async def _fetch(self) -> Snapshot:
+        service = HostawayService()
+        reviews = await service.fetch_and_normalize_reviews()
+        body = (
+            ReviewResponse(status="success", total=len(reviews), data=reviews)
+            .model_dump_json()
+            .encode()
+        )
+
+        snapshot = Snapshot(body, time.time())
+        self._snapshot = snapshot
+        await asyncio.to_thread(self._save_to_disk, snapshot)
+        return snapshot
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Error refreshing Hostaway snapshot: {task.exception()}")
+
+    def _load_from_disk(self) -> Optional[Snapshot]:
+        try:
+            with open(self.path, "rb") as f:
+                body = f.read()
+            return Snapshot(body, os.path.getmtime(self.path))
+        except OSError:
+            return None
+
+    def _save_to_disk(self, snapshot: Snapshot) -> None:
+        """Write atomically so a crash never leaves a truncated snapshot"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".hostaway-snapshot-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(snapshot.body)
+            os.utime(tmp_path, (snapshot.fetched_at, snapshot.fetched_at))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error saving Hostaway snapshot: {e}")
+
+    async def close(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+
+
+hostaway_snapshot = HostawaySnapshotService(
+    settings.HOSTAWAY_SNAPSHOT_PATH, settings.HOSTAWAY_SNAPSHOT_TTL_SECONDS
+)
@@ -0,0 +1,687 @@
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, case, update, delete, cast, bindparam, Integer
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.listing import Listing
+from app.models.review import Review
+from app.models.property_stats import PropertyStatsRollup
+from app.models.review_category_rating import ReviewCategoryRating
+from app.services.daily_stats import DailyStatsService
+from app.services.normalizer import effective_rating
+from app.schemas.review import (
+    CategoryAnalytics,
+    CategoryStats,
+    DashboardStats,
+    PropertyStats,
+    WeakestCategory,
+)
+
+# Number of most recent reviews compared against the previous window for trends
+TREND_WINDOW = 3
+TREND_THRESHOLD = 0.5
+RECENT_REVIEWS_SIZE = TREND_WINDOW * 2
+
+# Tolerance used when comparing stored float sums against recomputed ones
+FLOAT_TOLERANCE = 1e-6
+
+# Reviews read at a time by check_reviews
+REVIEW_CHECK_BATCH_SIZE = 1000
+
+# Rollup columns that new reviews add to
+COUNTER_COLUMNS = (
+    "total_reviews",
+    "rating_sum",
+    "rating_count",
+    "approved_count",
+    "featured_count",
+)
+
+
+def counter_upsert_statement(dialect):
+    """INSERT ... ON CONFLICT DO UPDATE adding the inserted counters to an existing rollup"""
+    table = PropertyStatsRollup.__table__
+    stmt = dialect.insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.property_id],
+        set_={
+            **{name: table.c[name] + stmt.excluded[name] for name in COUNTER_COLUMNS},
+            "updated_at": func.now(),
+        },
+    )
+
+
+# Built once and run with one parameter set per property
+COUNTER_UPSERTS = {
+    "postgresql": counter_upsert_statement(postgresql),
+    "sqlite": counter_upsert_statement(sqlite),
+}
+_table = PropertyStatsRollup.__table__
+RATING_DELTA_UPDATE = (
+    update(_table)
+    .where(_table.c.property_id == bindparam("prop_id"))
+    .values(
+        rating_sum=_table.c.rating_sum + bindparam("rating_sum_delta"),
+        rating_count=_table.c.rating_count + bindparam("rating_count_delta"),
+        updated_at=func.now(),
+    )
+)
+
+
+class StatsService:
+    """Service for review statistics backed by the property_stats rollup table"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_dashboard_stats(self) -> DashboardStats:
+        """Build dashboard statistics from the rollup table (one row per property)"""
+        query = select(PropertyStatsRollup).order_by(PropertyStatsRollup.property_id)
+        result = await self.db.execute(query)
+        rollups = {
+            rollup.property_id: self._rollup_to_dict(rollup)
+            for rollup in result.scalars().all()
+        }
+        listing_names = await self.listing_names()
+        for prop_id, rollup in rollups.items():
+            rollup["listing_name"] = listing_names.get(prop_id)
+        return self.build_dashboard(rollups)
+
+    async def listing_names(self) -> Dict[str, str]:
+        """Listing name per property, from the listings table"""
+        result = await self.db.execute(
+            select(Listing.property_id, func.max(Listing.name)).group_by(Listing.property_id)
+        )
+        return dict(result.all())
+
+    @classmethod
+    def build_dashboard(cls, rollups: Dict[str, Dict[str, Any]]) -> DashboardStats:
+        """Turn rollup dicts into the dashboard response"""
+        total_reviews = sum(r["total_reviews"] for r in rollups.values())
+        rating_sum = sum(r["rating_sum"] for r in rollups.values())
+        rating_count = sum(r["rating_count"] for r in rollups.values())
+        average_rating = rating_sum / rating_count if rating_count else 0.0
+
+        property_stats_list = []
+        for prop_id, rollup in rollups.items():
+            prop_avg_rating = (
+                rollup["rating_sum"] / rollup["rating_count"]
+                if rollup["rating_count"]
+                else 0.0
+            )
+
+            ratings_breakdown = {
+                cat: rollup["category_sums"][cat] / count
+                for cat, count in rollup["category_counts"].items()
+                if count
+            }
+
+            property_stats_list.append(
+                PropertyStats(
+                    property_id=prop_id,
+                    listing_name=rollup["listing_name"] or prop_id,
+                    total_reviews=rollup["total_reviews"],
+                    average_rating=round(prop_avg_rating, 2),
+                    ratings_breakdown=ratings_breakdown,
+                    recent_trend=cls.trend_from_recent(
+                        rollup["total_reviews"], rollup["recent_reviews"]
+                    ),
+                    approved_count=rollup["approved_count"],
+                    featured_count=rollup["featured_count"],
+                )
+            )
+
+        return DashboardStats(
+            total_reviews=total_reviews,
+            total_properties=len(rollups),
+            average_rating=round(average_rating, 2),
+            properties=property_stats_list,
+        )
+
+    @staticmethod
+    def trend_from_recent(total_reviews: int, recent_reviews: List[dict]) -> str:
+        """Determine trend (simple: last 3 vs previous 3)"""
+        if total_reviews < RECENT_REVIEWS_SIZE:
+            return "stable"
+
+        recent_ratings = [
+            r["rating"] for r in recent_reviews[:TREND_WINDOW] if r["rating"] is not None
+        ]
+        older_ratings = [
+            r["rating"]
+            for r in recent_reviews[TREND_WINDOW:RECENT_REVIEWS_SIZE]
+            if r["rating"] is not None
+        ]
+        if not recent_ratings or not older_ratings:
+            return "stable"
+
+        recent_avg = sum(recent_ratings) / len(recent_ratings)
+        older_avg = sum(older_ratings) / len(older_ratings)
+
+        if recent_avg > older_avg + TREND_THRESHOLD:
+            return "improving"
+        if recent_avg < older_avg - TREND_THRESHOLD:
+            return "declining"
+        return "stable"
+
+    @staticmethod
+    def _rollup_to_dict(rollup: PropertyStatsRollup) -> Dict[str, Any]:
+        return {
+            "total_reviews": rollup.total_reviews,
+            "rating_sum": rollup.rating_sum,
+            "rating_count": rollup.rating_count,
+            "category_sums": rollup.category_sums or {},
+            "category_counts": rollup.category_counts or {},
+            "approved_count": rollup.approved_count,
+            "featured_count": rollup.featured_count,
+            "recent_reviews": rollup.recent_reviews or [],
+        }
+
+    # ------------------------------------------------------------------
+    # Category analytics (review_category_ratings)
+    # ------------------------------------------------------------------
+
+    async def get_category_analytics(
+        self, property_id: Optional[str] = None
+    ) -> CategoryAnalytics:
+        """Per-category averages and distributions, and each property's weakest category"""
+        category = ReviewCategoryRating.category
+        rating = ReviewCategoryRating.rating
+
+        def scoped(query):
+            # The join is only needed to scope by property
+            if not property_id:
+                return query
+            return query.join(Review, Review.id == ReviewCategoryRating.review_id).where(
+                Review.property_id == property_id
+            )
+
+        summary = await self.db.execute(
+            scoped(
+                select(category, func.avg(rating), func.count(), func.min(rating), func.max(rating))
+            )
+            .group_by(category)
+            .order_by(category)
+        )
+
+        bucket = self._rating_bucket(rating)
+        buckets = await self.db.execute(
+            scoped(select(category, bucket, func.count())).group_by(category, bucket)
+        )
+        distributions: Dict[str, Dict[str, int]] = {}
+        for cat, point, count in buckets.all():
+            distributions.setdefault(cat, {})[str(point)] = count
+
+        categories = [
+            CategoryStats(
+                category=cat,
+                average_rating=round(avg, 2),
+                rating_count=count,
+                min_rating=low,
+                max_rating=high,
+                distribution=dict(
+                    sorted(distributions.get(cat, {}).items(), key=lambda item: int(item[0]))
+                ),
+            )
+            for cat, avg, count, low, high in summary.all()
+        ]
+
+        return CategoryAnalytics(
+            categories=categories,
+            weakest_by_property=await self._weakest_categories(property_id),
+        )
+
+    async def _weakest_categories(self, property_id: Optional[str]) -> List[WeakestCategory]:
+        """Lowest average category per property, ranked in the database"""
+        per_category = (
+            select(
+                Review.property_id.label("property_id"),
+                ReviewCategoryRating.category.label("category"),
+                func.avg(ReviewCategoryRating.rating).label("average_rating"),
+                func.count().label("rating_count"),
+            )
+            .join(Review, Review.id == ReviewCategoryRating.review_id)
+            .group_by(Review.property_id, ReviewCategoryRating.category)
+        )
+        if property_id:
+            per_category = per_category.where(Review.property_id == property_id)
+        per_category = per_category.subquery()
+
+        ranked = select(
+            per_category,
+            func.row_number()
+            .over(
+                partition_by=per_category.c.property_id,
+                order_by=(per_category.c.average_rating, per_category.c.category),
+            )
+            .label("rank"),
+        ).subquery()
+
+        result = await self.db.execute(
+            select(
+                ranked.c.property_id,
+                ranked.c.category,
+                ranked.c.average_rating,
+                ranked.c.rating_count,
+            )
+            .where(ranked.c.rank == 1)
+            .order_by(ranked.c.average_rating, ranked.c.property_id)
+        )
+        return [
+            WeakestCategory(
+                property_id=prop_id or "",
+                category=cat,
+                average_rating=round(avg, 2),
+                rating_count=count,
+            )
+            for prop_id, cat, avg, count in result.all()
+        ]
+
+    def _rating_bucket(self, rating):
+        """Whole rating point (floor); SQLite's CAST truncates, PostgreSQL's rounds"""
+        if self.db.bind.dialect.name == "postgresql":
+            return cast(func.floor(rating), Integer)
+        return cast(rating, Integer)
+
+    # ------------------------------------------------------------------
+    # Computation from the reviews table (rebuild / consistency check)
+    # ------------------------------------------------------------------
+
+    async def compute_rollups(self) -> Dict[str, Dict[str, Any]]:
+        """Recompute every property rollup from the reviews table"""
+        rollups = await self.property_aggregates()
+
+        for prop_id, cat_name, cat_sum, cat_count in await self.category_totals():
+            if prop_id in rollups:
+                rollups[prop_id]["category_sums"][cat_name] = float(cat_sum)
+                rollups[prop_id]["category_counts"][cat_name] = cat_count
+
+        for prop_id, recent in (await self.recent_reviews()).items():
+            if prop_id in rollups:
+                rollups[prop_id]["recent_reviews"] = recent
+
+        return rollups
+
+    async def property_aggregates(self) -> Dict[str, Dict[str, Any]]:
+        """Counts, rating sums and moderation counts grouped by property"""
+        query = (
+            select(
+                Review.property_id,
+                func.count(Review.id),
+                func.coalesce(func.sum(Review.rating), 0.0),
+                func.count(Review.rating),
+                func.coalesce(func.sum(case((Review.is_approved, 1), else_=0)), 0),
+                func.coalesce(func.sum(case((Review.is_featured, 1), else_=0)), 0),
+            )
+            .group_by(Review.property_id)
+            .order_by(Review.property_id)
+        )
+        result = await self.db.execute(query)
+
+        return {
+            prop_id or "": {
+                "total_reviews": total,
+                "rating_sum": float(rating_sum),
+                "rating_count": rating_count,
+                "category_sums": {},
+                "category_counts": {},
+                "approved_count": int(approved),
+                "featured_count": int(featured),
+                "recent_reviews": [],
+            }
+            for (
+                prop_id,
+                total,
+                rating_sum,
+                rating_count,
+                approved,
+                featured,
+            ) in result.all()
+        }
+
+    async def recent_reviews(self) -> Dict[str, List[dict]]:
+        """Most recent reviews per property, newest first, via a window function"""
+        ranked = select(
+            Review.property_id,
+            Review.external_id,
+            Review.submitted_at,
+            Review.rating,
+            func.row_number()
+            .over(
+                partition_by=Review.property_id,
+                order_by=(Review.submitted_at.desc(), Review.id),
+            )
+            .label("rn"),
+        ).subquery()
+
+        query = (
+            select(
+                ranked.c.property_id,
+                ranked.c.external_id,
+                ranked.c.submitted_at,
+                ranked.c.rating,
+            )
+            .where(ranked.c.rn <= RECENT_REVIEWS_SIZE)
+            .order_by(ranked.c.property_id, ranked.c.rn)
+        )
+        result = await self.db.execute(query)
+
+        recent: Dict[str, List[dict]] = {}
+        for prop_id, external_id, submitted_at, rating in result.all():
+            recent.setdefault(prop_id or "", []).append(
+                self._recent_entry(external_id, submitted_at, rating)
+            )
+        return recent
+
+    async def category_totals(self) -> List[tuple]:
+        """Category rating sums and counts per property, from review_category_ratings"""
+        query = (
+            select(
+                Review.property_id,
+                ReviewCategoryRating.category,
+                func.sum(ReviewCategoryRating.rating),
+                func.count(),
+            )
+            .join(Review, Review.id == ReviewCategoryRating.review_id)
+            .group_by(Review.property_id, ReviewCategoryRating.category)
+        )
+        result = await self.db.execute(query)
+
+        return [(prop_id or "", cat, total, count) for prop_id, cat, total, count in result.all()]
+
+    @staticmethod
+    def _recent_entry(external_id: str, submitted_at: Optional[datetime], rating) -> dict:
+        return {
+            "id": external_id,
+            "submitted_at": submitted_at.isoformat() if submitted_at else None,
+            "rating": rating,
+        }
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+
+    async def apply_inserted(self, reviews: Iterable[Dict[str, Any]]) -> None:
+        """
+        Fold newly inserted review rows into their property rollups.
+
+        Counters are added in SQL, so concurrent account syncs never lose each
+        other's increments. The upsert also write-locks each rollup until commit
+        (row locks on PostgreSQL, the database lock on SQLite), so the JSON
+        columns are then read and rewritten without racing another sync.
+        """
+        by_property: Dict[str, List[Dict[str, Any]]] = {}
+        for review in reviews:
+            by_property.setdefault(review["property_id"] or "", []).append(review)
+
+        if not by_property:
+            return
+
+        # Key order, so concurrent syncs lock shared rollups in the same order
+        counters = [
+            {
+                "property_id": prop_id,
+                "total_reviews": len(prop_reviews),
+                "rating_sum": sum(r["rating"] for r in prop_reviews if r["rating"] is not None),
+                "rating_count": sum(r["rating"] is not None for r in prop_reviews),
+                "approved_count": sum(bool(r["is_approved"]) for r in prop_reviews),
+                "featured_count": sum(bool(r["is_featured"]) for r in prop_reviews),
+            }
+            for prop_id, prop_reviews in sorted(by_property.items())
+        ]
+        await self.db.execute(COUNTER_UPSERTS[self._dialect()], counters)
+
+        rollups = await self._load_rollups(by_property)
+
+        for prop_id, prop_reviews in by_property.items():
+            rollup = rollups[prop_id]
+            category_sums = dict(rollup.category_sums or {})
+            category_counts = dict(rollup.category_counts or {})
+            recent = list(rollup.recent_reviews or [])
+
+            for review in prop_reviews:
+                for cat in review["review_categories"] or []:
+                    cat_name = cat["category"]
+                    category_sums[cat_name] = category_sums.get(cat_name, 0.0) + cat["rating"]
+                    category_counts[cat_name] = category_counts.get(cat_name, 0) + 1
+                recent.append(
+                    self._recent_entry(
+                        review["external_id"], review["submitted_at"], review["rating"]
+                    )
+                )
+
+            # Stable sort keeps existing entries ahead of new ones on equal timestamps
+            recent.sort(key=lambda r: r["submitted_at"] or "", reverse=True)
+
+            rollup.category_sums = category_sums
+            rollup.category_counts = category_counts
+            rollup.recent_reviews = recent[:RECENT_REVIEWS_SIZE]
+
+    async def apply_changes(self, changes: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+        """
+        Apply edits given (existing review row, incoming row) pairs: overall
+        rating changes and replaced category ratings
+        """
+        by_property: Dict[str, List[Tuple[Dict[str, Any], Dict[str, Any]]]] = {}
+        for review, incoming in changes:
+            if (
+                review["rating"] != incoming["rating"]
+                or review["review_categories"] != incoming["review_categories"]
+            ):
+                by_property.setdefault(review["property_id"] or "", []).append((review, incoming))
+
+        if not by_property:
+            return
+
+        # Deltas applied in SQL (and rollups locked) before the JSON columns are rewritten
+        await self.db.execute(
+            RATING_DELTA_UPDATE,
+            [
+                {
+                    "prop_id": prop_id,
+                    "rating_sum_delta": sum(
+                        (incoming["rating"] or 0.0) - (review["rating"] or 0.0)
+                        for review, incoming in prop_changes
+                    ),
+                    "rating_count_delta": sum(
+                        (incoming["rating"] is not None) - (review["rating"] is not None)
+                        for review, incoming in prop_changes
+                    ),
+                }
+                for prop_id, prop_changes in sorted(by_property.items())
+            ],
+        )
+
+        rollups = await self._load_rollups(by_property)
+
+        for prop_id, prop_changes in by_property.items():
+            rollup = rollups.get(prop_id)
+            if rollup is None:
+                continue
+
+            category_sums = dict(rollup.category_sums or {})
+            category_counts = dict(rollup.category_counts or {})
+            recent = [dict(entry) for entry in rollup.recent_reviews or []]
+            recent_by_id = {entry["id"]: entry for entry in recent}
+
+            for review, incoming in prop_changes:
+                if review["external_id"] in recent_by_id:
+                    recent_by_id[review["external_id"]]["rating"] = incoming["rating"]
+                if review["review_categories"] == incoming["review_categories"]:
+                    continue
+                edits = ((review["review_categories"], -1), (incoming["review_categories"], 1))
+                for categories, sign in edits:
+                    for cat in categories or []:
+                        cat_name = cat["category"]
+                        category_sums[cat_name] = (
+                            category_sums.get(cat_name, 0.0) + sign * float(cat["rating"])
+                        )
+                        category_counts[cat_name] = category_counts.get(cat_name, 0) + sign
+
+            # A recomputation has no entry for categories no review of the property has left
+            for cat_name, count in list(category_counts.items()):
+                if count <= 0:
+                    del category_counts[cat_name]
+                    category_sums.pop(cat_name, None)
+
+            rollup.category_sums = category_sums
+            rollup.category_counts = category_counts
+            rollup.recent_reviews = recent
+
+    async def _load_rollups(self, property_ids: Iterable[str]) -> Dict[str, PropertyStatsRollup]:
+        """Load current rollup rows for the given properties"""
+        query = (
+            select(PropertyStatsRollup)
+            .where(PropertyStatsRollup.property_id.in_(list(property_ids)))
+            # Counters were just changed in SQL; refresh rollups already in the session
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db.execute(query)
+        return {rollup.property_id: rollup for rollup in result.scalars().all()}
+
+    def _dialect(self) -> str:
+        return "postgresql" if self.db.bind.dialect.name == "postgresql" else "sqlite"
+
+    async def apply_moderation(
+        self, property_id: Optional[str], approved_delta: int, featured_delta: int
+    ) -> None:
+        """Adjust approved/featured counters for a property in a single UPDATE"""
+        if not approved_delta and not featured_delta:
+            return
+
+        await self.db.execute(
+            update(PropertyStatsRollup)
+            .where(PropertyStatsRollup.property_id == (property_id or ""))
+            .values(
+                approved_count=PropertyStatsRollup.approved_count + approved_delta,
+                featured_count=PropertyStatsRollup.featured_count + featured_delta,
+            )
+        )
+
+    # ------------------------------------------------------------------
+    # Rebuild and consistency check
+    # ------------------------------------------------------------------
+
+    async def rebuild(self) -> int:
+        """Recompute the rollup tables from reviews, returns the number of properties"""
+        rollups = await self.compute_rollups()
+
+        await self.db.execute(delete(PropertyStatsRollup))
+        self.db.add_all(
+            PropertyStatsRollup(property_id=prop_id, **rollup)
+            for prop_id, rollup in rollups.items()
+        )
+        await DailyStatsService(self.db).rebuild()
+        await self.db.commit()
+
+        return len(rollups)
+
+    async def rebuild_if_empty(self) -> bool:
+        """Populate the rollup table on first start against an existing database"""
+        rollup_count = await self.db.scalar(select(func.count()).select_from(PropertyStatsRollup))
+        if rollup_count:
+            return False
+
+        review_count = await self.db.scalar(select(func.count(Review.id)))
+        if not review_count:
+            return False
+
+        await self.rebuild()
+        return True
+
+    async def check_consistency(self) -> List[str]:
+        """Compare stored rollups against a fresh recomputation, returns mismatches"""
+        expected = await self.compute_rollups()
+
+        result = await self.db.execute(select(PropertyStatsRollup))
+        stored = {
+            rollup.property_id: self._rollup_to_dict(rollup)
+            for rollup in result.scalars().all()
+        }
+
+        problems = []
+        for prop_id in sorted(set(expected) | set(stored)):
+            if prop_id not in stored:
+                problems.append(f"{prop_id}: missing from property_stats")
+                continue
+            if prop_id not in expected:
+                problems.append(f"{prop_id}: no reviews but present in property_stats")
+                continue
+
+            for field, expected_value in expected[prop_id].items():
+                if not self._values_match(expected_value, stored[prop_id][field]):
+                    problems.append(
+                        f"{prop_id}: {field} is {stored[prop_id][field]!r}, "
+                        f"expected {expected_value!r}"
+                    )
+
+        problems.extend(await self.check_reviews())
+        problems.extend(await DailyStatsService(self.db).check_consistency())
+        return problems
+
+    async def check_reviews(self) -> List[str]:
+        """
+        Compare each review's stored categories, average_rating and category_count
+        with its review_category_ratings rows, returns mismatches
+        """
+        children = (
+            select(
+                ReviewCategoryRating.review_id,
+                func.count().label("count"),
+                func.sum(ReviewCategoryRating.rating).label("total"),
+            )
+            .group_by(ReviewCategoryRating.review_id)
+            .subquery()
+        )
+        query = (
+            select(
+                Review.external_id,
+                Review.rating,
+                Review.average_rating,
+                Review.category_count,
+                Review.review_categories,
+                func.coalesce(children.c.count, 0),
+                func.coalesce(children.c.total, 0.0),
+            )
+            .outerjoin(children, children.c.review_id == Review.id)
+            .order_by(Review.id)
+        )
+
+        problems = []
+        result = await self.db.stream(query.execution_options(yield_per=REVIEW_CHECK_BATCH_SIZE))
+        async for external_id, rating, average, count, categories, child_count, child_sum in result:
+            categories = categories or []
+            ratings = [float(cat["rating"]) for cat in categories]
+            expected_average = effective_rating(rating, categories)
+            if child_count != len(ratings) or abs(child_sum - sum(ratings)) > FLOAT_TOLERANCE:
+                problems.append(
+                    f"review {external_id}: {child_count} category rating rows summing to "
+                    f"{child_sum!r}, expected {len(ratings)} summing to {sum(ratings)!r}"
+                )
+            if count != len(ratings):
+                problems.append(
+                    f"review {external_id}: category_count is {count!r}, expected {len(ratings)}"
+                )
+            if not self._values_match(expected_average, average):
+                problems.append(
+                    f"review {external_id}: average_rating is {average!r}, "
+                    f"expected {expected_average!r}"
+                )
+        return problems
+
+    @classmethod
+    def _values_match(cls, expected, actual) -> bool:
+        if isinstance(expected, float) or isinstance(actual, float):
+            if expected is None or actual is None:
+                return expected is actual
+            return abs(expected - actual) <= FLOAT_TOLERANCE
+        if isinstance(expected, dict) and isinstance(actual, dict):
+            return expected.keys() == actual.keys() and all(
+                cls._values_match(expected[k], actual[k]) for k in expected
+            )
+        if isinstance(expected, list) and isinstance(actual, list):
+            return len(expected) == len(actual) and all(
+                cls._values_match(e, a) for e, a in zip(expected, actual)
+            )
+        return expected == actual
@@ -0,0 +1,468 @@
+import asyncio
+import logging
+import time
+from typing import (
+    Dict,
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.config import settings
+from app.core.metrics import SYNC_DURATION, SYNC_ROWS
+from app.models.hostaway_account import HostawayAccount
+from app.models.review import Review
+from app.models.review_category_rating import ReviewCategoryRating
+from app.models.sync_cursor import SyncCursor
+from app.schemas.review import SyncResult
+from app.services.daily_stats import DailyStatsService
+from app.services.hostaway import HostawayService
+from app.services.listings import ListingService, listing_key, listing_row
+from app.services.public_feed import PublicFeedService
+from app.services.stats import StatsService
+
+logger = logging.getLogger(__name__)
+
+# Fields refreshed on existing reviews when Hostaway reports a change
+UPDATABLE_FIELDS = ("status", "rating", "public_review", "review_categories")
+# Columns derived at write time, rewritten together with the fields above
+DERIVED_FIELDS = ("average_rating", "category_count")
+
+
+class ReviewSyncService:
+    """Service for writing normalized reviews to the database in bulk"""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        batch_size: Optional[int] = None,
+        update_existing: Optional[bool] = None,
+        on_batch: Optional[Callable[[SyncResult], None]] = None,
+    ):
+        self.db = db
+        self.batch_size = batch_size or settings.SYNC_BATCH_SIZE
+        self.update_existing = (
+            settings.SYNC_UPDATE_EXISTING if update_existing is None else update_existing
+        )
+        self.stats = StatsService(db)
+        self.daily_stats = DailyStatsService(db)
+        self.listings = ListingService(db)
+        self.public_feeds = PublicFeedService(db)
+        # Called with the running totals before each batch commits
+        self.on_batch = on_batch
+
+    async def sync_from_hostaway(
+        self, hostaway: HostawayService, mode: str = "auto", rebuild_stats: bool = True
+    ) -> SyncResult:
+        """
+        Sync one Hostaway account using its persisted cursor.
+
+        "incremental" only requests reviews submitted since the cursor, "full"
+        refetches everything, updates edited reviews and removes deleted ones,
+        and "auto" runs a full reconciliation when none has happened within
+        SYNC_FULL_RECONCILE_HOURS. Deletions and listings moved to another
+        property rebuild the stats rollups at the end unless `rebuild_stats` is
+        False, in which case the caller must rebuild them (see rollups_stale).
+        """
+        started = time.perf_counter()
+        cursor = await self.db.get(SyncCursor, hostaway.account_id)
+        mode = self._resolve_mode(cursor, mode)
+        full = mode == "full"
+
+        since = cursor.last_submitted_at if not full else None
+        seen_ids: Set[str] = set()
+        newest: Optional[Dict[str, Any]] = None
+
+        async def tracked_reviews() -> AsyncIterator[Dict[str, Any]]:
+            # Keep only what the cursor and reconciliation need, not the reviews
+            nonlocal newest
+            async for review in hostaway.iter_normalized_rows(since=since):
+                review["account_id"] = hostaway.account_id
+                if full:
+                    seen_ids.add(review["id"])
+                if newest is None or (review["submitted_at"], review["id"]) > (
+                    newest["submitted_at"],
+                    newest["id"],
+                ):
+                    newest = review
+                yield review
+
+        if full:
+            # Reconciliation exists to pick up edits, so always apply them
+            self.update_existing = True
+        result = await self.sync(tracked_reviews())
+        result.mode = mode
+
+        # Never treat mock data as the source of truth for deletions
+        if full and not hostaway.used_mock_data:
+            result.deleted, deleted_properties = await self._delete_missing(
+                hostaway.account_id, seen_ids
+            )
+            await self.public_feeds.regenerate(deleted_properties)
+        if rebuild_stats and self.rollups_stale(result):
+            await self.stats.rebuild()
+
+        await self._advance_cursor(hostaway.account_id, cursor, newest, full)
+
+        SYNC_DURATION.observe(time.perf_counter() - started, mode=mode)
+        for operation in ("inserted", "updated", "deleted"):
+            SYNC_ROWS.inc(getattr(result, operation), operation=operation)
+        return result
+
+    def rollups_stale(self, result: SyncResult) -> bool:
+        """Whether the sync made changes the rollup deltas cannot express"""
+        # Deletions can evict entries from the recent-review ring, and moved
+        # listings take their reviews' counts and recent entries to another property
+        return bool(result.deleted or self.listings.moved_listings)
+
+    @staticmethod
+    def _resolve_mode(cursor: Optional[SyncCursor], mode: str) -> str:
+        """Pick incremental or full sync for the requested mode"""
+        if cursor is None or cursor.last_submitted_at is None:
+            return "full"
+        if mode != "auto":
+            return mode
+
+        reconcile_after = timedelta(hours=settings.SYNC_FULL_RECONCILE_HOURS)
+        if (
+            cursor.last_full_sync_at is None
+            or datetime.utcnow() - cursor.last_full_sync_at >= reconcile_after
+        ):
+            return "full"
+        return "incremental"
+
+    async def _advance_cursor(
+        self,
+        account_id: str,
+        cursor: Optional[SyncCursor],
+        newest: Optional[Dict[str, Any]],
+        full: bool,
+    ) -> None:
+        """Move the high-water mark to the newest review seen and record the run"""
+        if cursor is None:
+            cursor = SyncCursor(account_id=account_id)
+            self.db.add(cursor)
+
+        if newest is not None:
+            submitted_at = newest["submitted_at"]
+            if cursor.last_submitted_at is None or submitted_at >= cursor.last_submitted_at:
+                cursor.last_submitted_at = submitted_at
+                cursor.last_external_id = newest["id"]
+
+        now = datetime.utcnow()
+        cursor.last_sync_at = now
+        if full:
+            cursor.last_full_sync_at = now
+
+        await self.db.commit()
+
+    async def _delete_missing(
+        self, account_id: str, seen_ids: Set[str]
+    ) -> Tuple[int, Set[str]]:
+        """
+        Delete the account's reviews no longer returned by Hostaway, returns
+        the number deleted and their properties
+        """
+        result = await self.db.execute(
+            select(Review.external_id, Review.property_id).where(Review.account_id == account_id)
+        )
+        missing, properties = [], set()
+        for ext_id, property_id in result.all():
+            if ext_id not in seen_ids:
+                missing.append(ext_id)
+                properties.add(property_id)
+
+        for start in range(0, len(missing), self.batch_size):
+            chunk = missing[start : start + self.batch_size]
+            # Explicit, as SQLite does not enforce the ON DELETE CASCADE by default
+            await self.db.execute(
+                delete(ReviewCategoryRating).where(
+                    ReviewCategoryRating.review_id.in_(
+                        select(Review.id).where(Review.external_id.in_(chunk))
+                    )
+                )
+            )
+            await self.db.execute(delete(Review).where(Review.external_id.in_(chunk)))
+
+        return len(missing), properties
+
+    async def sync(self, reviews: AsyncIterable[Dict[str, Any]]) -> SyncResult:
+        """
+        Insert new reviews and update changed ones, one batch per transaction.
+
+        Reviews are normalized dicts (see app.services.normalizer) consumed as a
+        stream so at most one batch is held in memory.
+        """
+        result = SyncResult()
+
+        batch: List[Dict[str, Any]] = []
+        async for review in reviews:
+            batch.append(review)
+            if len(batch) >= self.batch_size:
+                await self.sync_batch(batch, result)
+                batch = []
+
+        if batch:
+            await self.sync_batch(batch, result)
+
+        return result
+
+    async def sync_batch(self, reviews: List[Dict[str, Any]], result: SyncResult) -> None:
+        """Write one batch: listing upsert, one lookup, one multi-row INSERT, one bulk UPDATE"""
+        listing_rows = [listing_row(review) for review in reviews]
+        listing_ids = await self.listings.resolve(listing_rows)
+        # Every review of a moved listing is counted as updated once, when it moves
+        moved = self.listings.moved_listings
+        result.updated += self.listings.moved_reviews
+        result.listings_written += self.listings.written
+
+        # Later duplicates of the same review win
+        rows_by_id = {
+            review["id"]: self.to_row(review, listing_ids[listing_key(listing)])
+            for review, listing in zip(reviews, listing_rows)
+        }
+        existing = await self._fetch_existing(list(rows_by_id))
+
+        new_rows = [row for ext_id, row in rows_by_id.items() if ext_id not in existing]
+        inserted_rows = await self._insert(new_rows)
+        await self._insert_category_ratings(inserted_rows)
+        result.inserted += len(inserted_rows)
+        # Rows lost to a concurrent insert are treated as already present
+        result.unchanged += len(new_rows) - len(inserted_rows)
+
+        changed = []
+        for ext_id, current in existing.items():
+            incoming = rows_by_id[ext_id]
+            if self.update_existing and any(
+                current[field] != incoming[field] for field in UPDATABLE_FIELDS
+            ):
+                changed.append((current, incoming))
+            elif current["listing_ref_id"] not in moved:
+                result.unchanged += 1
+
+        if changed:
+            await self.db.execute(
+                update(Review),
+                [
+                    {
+                        "id": current["id"],
+                        **{f: incoming[f] for f in UPDATABLE_FIELDS + DERIVED_FIELDS},
+                    }
+                    for current, incoming in changed
+                ],
+            )
+            result.updated += sum(
+                1 for current, _ in changed if current["listing_ref_id"] not in moved
+            )
+            await self._replace_category_ratings(changed)
+
+        # Reviews moved with their listing are left to the rebuild (see rollups_stale)
+        await self.stats.apply_inserted(inserted_rows)
+        await self.stats.apply_changes(changed)
+        await self.daily_stats.apply_inserted(inserted_rows)
+        await self.daily_stats.apply_changes(changed)
+        # New reviews are never approved yet, so only edits, renames and moves reach the feeds
+        await self.public_feeds.regenerate(
+            {current["property_id"] for current, _ in changed} | self.listings.changed_properties
+        )
+        if self.on_batch is not None:
+            self.on_batch(result)
+        await self.db.commit()
+
+    async def _fetch_existing(self, external_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Look up already stored reviews for a batch with a single IN query"""
+        if not external_ids:
+            return {}
+
+        query = select(
+            Review.id,
+            Review.external_id,
+            Review.listing_ref_id,
+            Review.property_id,
+            Review.channel,
+            Review.submitted_at,
+            Review.average_rating,
+            *(getattr(Review, field) for field in UPDATABLE_FIELDS),
+        ).where(Review.external_id.in_(external_ids))
+        result = await self.db.execute(query)
+
+        return {row.external_id: row._asdict() for row in result.all()}
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        INSERT ... ON CONFLICT DO NOTHING for the whole batch, returns the rows
+        actually inserted with their new primary keys under "id"
+        """
+        if not rows:
+            return []
+
+        # One cached statement with a parameter set per row; the driver batches
+        # them into multi-row INSERT ... RETURNING (insertmanyvalues)
+        stmt = (
+            self._insert_statement()
+            .on_conflict_do_nothing(index_elements=[Review.__table__.c.external_id])
+            .returning(Review.__table__.c.id, Review.__table__.c.external_id)
+        )
+        result = await self.db.execute(stmt, rows)
+        inserted_ids = {external_id: review_id for review_id, external_id in result.all()}
+
+        return [
+            {**row, "id": inserted_ids[row["external_id"]]}
+            for row in rows
+            if row["external_id"] in inserted_ids
+        ]
+
+    async def _insert_category_ratings(self, rows: List[Dict[str, Any]]) -> None:
+        """Mirror the category ratings of newly inserted reviews into their child table"""
+        ratings = category_rating_rows(rows)
+        if ratings:
+            await self.db.execute(insert(ReviewCategoryRating), ratings)
+
+    async def _replace_category_ratings(
+        self, changed: List[Tuple[Dict[str, Any], Dict[str, Any]]]
+    ) -> None:
+        """Rewrite the child rows of updated reviews whose categories changed"""
+        recategorized = [
+            {"id": current["id"], "review_categories": incoming["review_categories"]}
+            for current, incoming in changed
+            if current["review_categories"] != incoming["review_categories"]
+        ]
+        if not recategorized:
+            return
+
+        # At most one batch of reviews, so one IN list
+        await self.db.execute(
+            delete(ReviewCategoryRating).where(
+                ReviewCategoryRating.review_id.in_([review["id"] for review in recategorized])
+            )
+        )
+        await self._insert_category_ratings(recategorized)
+
+    def _insert_statement(self):
+        """Dialect-specific Core INSERT (on the table, not the entity) supporting ON CONFLICT"""
+        if self.db.bind.dialect.name == "postgresql":
+            return postgresql.insert(Review.__table__)
+        return sqlite.insert(Review.__table__)
+
+    @staticmethod
+    def to_row(review_data: Dict[str, Any], listing_ref_id: Optional[int]) -> Dict[str, Any]:
+        """Map a normalized review dict and its listings.id onto reviews table columns"""
+        return {
+            "external_id": review_data["id"],
+            "account_id": review_data.get("account_id"),
+            "listing_id": review_data["listing_id"],
+            "listing_ref_id": listing_ref_id,
+            "property_id": review_data["property_id"],
+            "review_type": review_data["review_type"],
+            "status": review_data["status"],
+            "rating": review_data["rating"],
+            "average_rating": review_data["average_rating"],
+            "public_review": review_data["public_review"],
+            "review_categories": review_data["review_categories"],
+            "category_count": len(review_data["review_categories"]),
+            "guest_name": review_data["guest_name"],
+            "channel": review_data["channel"],
+            "submitted_at": review_data["submitted_at"],
+            "is_approved": False,
+            "is_featured": False,
+        }
+
+
+def category_rating_rows(reviews: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """review_category_ratings rows for reviews carrying their "id" and categories"""
+    return [
+        {"review_id": review["id"], "category": cat["category"], "rating": float(cat["rating"])}
+        for review in reviews
+        for cat in review["review_categories"] or []
+    ]
+
+
+# Progress callback: account_id, pages fetched, running totals (or the exception
+# the account failed with), finished
+AccountProgress = Callable[[str, int, Union[SyncResult, Exception, None], bool], None]
+
+
+class MultiAccountSync:
+    """Syncs several Hostaway accounts in parallel, each in its own session"""
+
+    def __init__(
+        self,
+        session_factory,
+        concurrency: Optional[int] = None,
+        update_existing: Optional[bool] = None,
+        on_progress: Optional[AccountProgress] = None,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency or settings.SYNC_ACCOUNT_CONCURRENCY
+        self.update_existing = update_existing
+        self.on_progress = on_progress
+
+    async def run(
+        self, accounts: List[HostawayAccount], mode: str = "auto"
+    ) -> Dict[str, Union[SyncResult, Exception]]:
+        """
+        Sync every account with at most `concurrency` running at once.
+
+        One failing account does not stop the others; its exception is returned
+        in place of a result. Stats rollups are rebuilt once at the end, after
+        every account's session has committed, if any account deleted reviews
+        or moved a listing to another property.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        stale: Set[str] = set()
+
+        async def sync_account(account: HostawayAccount) -> Union[SyncResult, Exception]:
+            async with semaphore:
+                return await self._sync_account(account, mode, stale)
+
+        results = await asyncio.gather(*(sync_account(account) for account in accounts))
+        outcomes = {account.account_id: result for account, result in zip(accounts, results)}
+
+        if stale:
+            async with self.session_factory() as session:
+                await StatsService(session).rebuild()
+
+        return outcomes
+
+    async def _sync_account(
+        self, account: HostawayAccount, mode: str, stale: Set[str]
+    ) -> Union[SyncResult, Exception]:
+        """Sync one account, adding it to `stale` if the rollups need a rebuild"""
+        hostaway = HostawayService(account=account)
+
+        def report(result: Union[SyncResult, Exception, None], done: bool = False) -> None:
+            if self.on_progress is not None:
+                self.on_progress(account.account_id, hostaway.pages_fetched, result, done)
+
+        async with self.session_factory() as session:
+            sync_service = ReviewSyncService(
+                session, update_existing=self.update_existing, on_batch=report
+            )
+            try:
+                result = await sync_service.sync_from_hostaway(
+                    hostaway, mode=mode, rebuild_stats=False
+                )
+            except Exception as e:
+                await session.rollback()
+                logger.exception("Error syncing Hostaway account %s", account.account_id)
+                if sync_service.listings.moved_listings:
+                    # Batches that moved reviews committed before the failure
+                    stale.add(account.account_id)
+                report(e, done=True)
+                return e
+
+        if sync_service.rollups_stale(result):
+            stale.add(account.account_id)
+        report(result, done=True)
+        return result
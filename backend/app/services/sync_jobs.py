@@ -0,0 +1,312 @@
+"""
+Background Hostaway sync jobs.
+
+POST /api/reviews/sync only records a queued job; a single worker claims jobs
+one at a time and runs them outside the request. Jobs live in the sync_jobs
+table, so any process can enqueue and report progress while one process (the
+API by default, or `python -m app.cli sync-worker`) runs the worker. A job is
+only claimed while no other job is running, so syncs never overlap, even with
+several workers. The running job records its worker and a heartbeat; a job
+whose heartbeat is older than SYNC_JOB_STALE_SECONDS belonged to a worker that
+died and is failed by the next claim. Each job fans out across the Hostaway
+accounts (see MultiAccountSync).
+"""
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from sqlalchemy import func, or_, select, update
+
+from app.core.cache import REVIEWS, STATS, response_cache
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.sync_job import SyncJob
+from app.schemas.review import SyncResult
+from app.services.accounts import AccountService
+from app.services.sync import MultiAccountSync
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# How often job progress and the heartbeat are written while accounts sync
+PROGRESS_INTERVAL_SECONDS = 1.0
+# PostgreSQL advisory lock held while a worker claims a job
+CLAIM_LOCK_KEY = 0x53594E43
+
+
+def describe_error(error: BaseException) -> str:
+    """Exception message for a job's error, the exception type if it has none"""
+    return str(error) or type(error).__name__
+
+
+class SyncJobQueue:
+    """Enqueues sync jobs and runs them with a single, non-overlapping worker"""
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def enqueue(
+        self,
+        mode: str = "auto",
+        update_existing: Optional[bool] = None,
+        trigger: str = "manual",
+        account_id: Optional[str] = None,
+    ) -> SyncJob:
+        """Queue a sync of one or all accounts, reusing an identical job not started yet"""
+        same_options = [
+            SyncJob.update_existing.is_(None)
+            if update_existing is None
+            else SyncJob.update_existing == update_existing,
+            SyncJob.account_id.is_(None)
+            if account_id is None
+            else SyncJob.account_id == account_id,
+        ]
+
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(SyncJob)
+                .where(SyncJob.status == QUEUED, SyncJob.requested_mode == mode, *same_options)
+                .order_by(SyncJob.id)
+                .limit(1)
+            )
+            job = result.scalar_one_or_none()
+            if job is None:
+                job = SyncJob(
+                    status=QUEUED,
+                    trigger=trigger,
+                    account_id=account_id,
+                    requested_mode=mode,
+                    update_existing=update_existing,
+                )
+                session.add(job)
+                await session.commit()
+                await session.refresh(job)
+
+        self._wakeup.set()
+        return job
+
+    async def get_job(self, job_id: int) -> Optional[SyncJob]:
+        async with self.session_factory() as session:
+            return await session.get(SyncJob, job_id)
+
+    async def list_jobs(self, limit: int = 20) -> List[SyncJob]:
+        """Most recent jobs first"""
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(SyncJob).order_by(SyncJob.id.desc()).limit(limit)
+            )
+            return list(result.scalars().all())
+
+    async def run_next(self) -> bool:
+        """Claim and run the oldest queued job, returns False if none could be claimed"""
+        async with self._lock:
+            job_id = await self._claim_next()
+            if job_id is None:
+                return False
+            await self._run(job_id)
+            return True
+
+    async def _claim_next(self) -> Optional[int]:
+        """
+        Atomically mark the oldest queued job running on this worker, unless a
+        job is already running. Running jobs of dead workers are failed first.
+        """
+        now = datetime.utcnow()
+        oldest_queued = (
+            select(SyncJob.id)
+            .where(SyncJob.status == QUEUED)
+            .order_by(SyncJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        running = select(SyncJob.id).where(SyncJob.status == RUNNING).exists()
+
+        async with self.session_factory() as session:
+            if session.bind.dialect.name == "postgresql":
+                # Until commit, so a concurrent claim sees this one's running job;
+                # SQLite's database write lock already serializes the statements
+                await session.execute(select(func.pg_advisory_xact_lock(CLAIM_LOCK_KEY)))
+            await self._fail_stale(session, now)
+            result = await session.execute(
+                update(SyncJob)
+                .where(SyncJob.id == oldest_queued, SyncJob.status == QUEUED, ~running)
+                .values(status=RUNNING, started_at=now, locked_by=self.worker_id, heartbeat_at=now)
+                .returning(SyncJob.id)
+            )
+            job_id = result.scalar_one_or_none()
+            await session.commit()
+        return job_id
+
+    async def _fail_stale(self, session, now: datetime) -> None:
+        """Running jobs without a recent heartbeat can never finish, mark them failed"""
+        cutoff = now - timedelta(seconds=settings.SYNC_JOB_STALE_SECONDS)
+        result = await session.execute(
+            update(SyncJob)
+            .where(
+                SyncJob.status == RUNNING,
+                or_(SyncJob.heartbeat_at.is_(None), SyncJob.heartbeat_at < cutoff),
+            )
+            .values(
+                status=FAILED,
+                error="Worker stopped responding",
+                finished_at=now,
+            )
+            .returning(SyncJob.id, SyncJob.locked_by)
+        )
+        for job_id, worker in result.all():
+            logger.warning("Sync job %s failed: worker %s stopped responding", job_id, worker)
+
+    async def _run(self, job_id: int) -> None:
+        async with self.session_factory() as session:
+            job = await session.get(SyncJob, job_id)
+            if job.account_id is not None:
+                account = await AccountService(session).get_account(job.account_id)
+                accounts = [account] if account is not None else []
+            else:
+                accounts = await AccountService(session).list_accounts()
+
+            progress: Dict[str, Tuple[int, SyncResult]] = {}
+            finished: Set[str] = set()
+            failures: Dict[str, str] = {}
+
+            def record_progress(
+                account_id: str,
+                pages: int,
+                result: Union[SyncResult, Exception, None],
+                done: bool,
+            ) -> None:
+                previous = progress.get(account_id, (0, SyncResult()))
+                if isinstance(result, Exception):
+                    # Reported on the job right away, not only once every account is done
+                    failures[account_id] = describe_error(result)
+                    result = None
+                progress[account_id] = (pages, result or previous[1])
+                if done:
+                    finished.add(account_id)
+
+            def apply_progress() -> None:
+                totals = [result for _, result in progress.values()]
+                job.accounts_total = len(accounts)
+                job.accounts_done = len(finished)
+                job.pages_fetched = sum(pages for pages, _ in progress.values())
+                job.inserted = sum(result.inserted for result in totals)
+                job.updated = sum(result.updated for result in totals)
+                job.unchanged = sum(result.unchanged for result in totals)
+                job.deleted = sum(result.deleted for result in totals)
+                listings = sum(result.listings_written for result in totals)
+                job.rows_written = job.inserted + job.updated + job.deleted + listings
+                job.error = "; ".join(f"{a}: {e}" for a, e in failures.items()) or None
+                job.heartbeat_at = datetime.utcnow()
+
+            fan_out = MultiAccountSync(
+                self.session_factory,
+                update_existing=job.update_existing,
+                on_progress=record_progress,
+            )
+            runner = asyncio.create_task(fan_out.run(accounts, mode=job.requested_mode))
+            try:
+                try:
+                    # Account syncs commit in their own sessions; publish progress meanwhile
+                    while not runner.done():
+                        await asyncio.wait({runner}, timeout=PROGRESS_INTERVAL_SECONDS)
+                        apply_progress()
+                        await session.commit()
+                    outcomes = runner.result()
+                except BaseException as e:
+                    # Includes cancellation on shutdown, so the job is never left running
+                    runner.cancel()
+                    await asyncio.gather(runner, return_exceptions=True)
+                    await session.rollback()
+                    apply_progress()
+                    job.status = FAILED
+                    job.error = describe_error(e)
+                    job.finished_at = datetime.utcnow()
+                    await session.commit()
+                    logger.exception("Sync job %s failed", job_id)
+                    raise
+
+                apply_progress()
+                errors = [
+                    f"{account_id}: {describe_error(outcome)}"
+                    for account_id, outcome in outcomes.items()
+                    if isinstance(outcome, Exception)
+                ]
+                if not accounts:
+                    errors.append(f"Unknown Hostaway account: {job.account_id}")
+                modes = {
+                    outcome.mode
+                    for outcome in outcomes.values()
+                    if isinstance(outcome, SyncResult)
+                }
+                job.mode = modes.pop() if len(modes) == 1 else ("mixed" if modes else None)
+                job.status = FAILED if errors else SUCCEEDED
+                job.error = "; ".join(errors) or None
+                job.finished_at = datetime.utcnow()
+                await session.commit()
+            finally:
+                # Batches commit as they go, so a failed or cancelled job may have written too
+                if job.rows_written:
+                    await response_cache.invalidate(REVIEWS, STATS)
+
+    async def work(self) -> None:
+        """Run queued jobs forever, waking on local enqueues or every poll interval"""
+        # Bound to the running loop, not the one current at import time
+        self._wakeup = asyncio.Event()
+        while True:
+            self._wakeup.clear()
+            try:
+                if await self.run_next():
+                    continue
+            except Exception:
+                # Already recorded on the job; keep serving the queue
+                pass
+
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=settings.SYNC_WORKER_POLL_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def schedule(self, interval_minutes: int) -> None:
+        """Queue an "auto" sync every interval"""
+        while True:
+            await asyncio.sleep(interval_minutes * 60)
+            try:
+                await self.enqueue(mode="auto", trigger="scheduled")
+            except Exception:
+                logger.exception("Error scheduling sync")
+
+    def start(self) -> None:
+        """Start the worker and, if configured, the scheduler (called on startup)"""
+        self._tasks.append(asyncio.create_task(self.work()))
+        if settings.SYNC_SCHEDULE_MINUTES > 0:
+            self._tasks.append(
+                asyncio.create_task(self.schedule(settings.SYNC_SCHEDULE_MINUTES))
+            )
+
+    async def wait(self) -> None:
+        """Block until the worker and scheduler stop"""
+        await asyncio.gather(*self._tasks)
+
+    async def stop(self) -> None:
+        """Cancel the worker and scheduler (called on shutdown)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+sync_jobs = SyncJobQueue()
@@ -0,0 +1,143 @@
+"""
+Seeded generator of Hostaway-shaped review payloads.
+
+Produces any number of reviews (10k, 100k, 1M, ...) spread over a
+configurable set of listings and channels, with the shapes the normalizers
+have to handle: overall ratings or category-only ratings, missing
+categories, host-to-guest and unpublished reviews. The same arguments always
+produce the same reviews, so benchmark runs are comparable across commits.
+
+Usage:
+    python -m bench.generator --reviews 100000 [--properties 50] [--seed 1] [--out reviews.json]
+"""
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Sequence
+
+import orjson
+
+CHANNELS = ("Airbnb", "Booking.com", "Expedia", "VRBO", "Direct")
+# Relative share of reviews per channel, in CHANNELS order
+CHANNEL_WEIGHTS = (45, 30, 10, 10, 5)
+CATEGORIES = ("cleanliness", "communication", "location", "value", "amenities")
+
+UNITS = ("Studio", "1B", "2B", "3B")
+AREAS = (
+    ("N1", "Shoreditch Heights"),
+    ("W2", "Hyde Park Terrace"),
+    ("E1", "Notting Hill Mansion"),
+    ("S1", "Camden Lock"),
+    ("SE1", "Borough Yards"),
+    ("NW3", "Hampstead Court"),
+)
+FIRST_NAMES = ("Sarah", "James", "Maria", "Ahmed", "Chloe", "Lucas", "Priya", "Tom", "Yuki", "Elena")
+LAST_NAMES = ("Johnson", "Smith", "Garcia", "Khan", "Martin", "Rossi", "Patel", "Brown", "Sato")
+OPENINGS = (
+    "Amazing stay",
+    "Great location",
+    "Lovely apartment",
+    "Decent place",
+    "Disappointing visit",
+    "Perfect for a weekend",
+)
+DETAILS = (
+    "the flat was spotless and modern",
+    "check-in was smooth and the host replied quickly",
+    "the heating was not working properly",
+    "walking distance to the tube and restaurants",
+    "a bit noisy at night because of the street",
+    "the kitchen had everything we needed",
+    "wifi was slow for video calls",
+    "beds were comfortable and the towels fresh",
+)
+
+START = datetime(2022, 1, 1)
+
+
+def listings(properties: int) -> List[Dict[str, Any]]:
+    """listingMapId and listingName of each generated property"""
+    result = []
+    for i in range(properties):
+        code, street = AREAS[i % len(AREAS)]
+        unit = UNITS[i % len(UNITS)]
+        # "2B N1 A - 29 Shoreditch Heights" -> property ID "2B N1 A"
+        letter = chr(ord("A") + i // len(AREAS) % 26)
+        suffix = str(i // (len(AREAS) * 26)) if i >= len(AREAS) * 26 else ""
+        result.append(
+            {
+                "listingMapId": 10000 + i,
+                "listingName": f"{unit} {code} {letter}{suffix} - {10 + i % 90} {street}",
+            }
+        )
+    return result
+
+
+def generate_reviews(
+    count: int,
+    properties: int = 50,
+    channels: Sequence[str] = CHANNELS,
+    seed: int = 1,
+    days: int = 3 * 365,
+    first_id: int = 1000000,
+) -> Iterator[Dict[str, Any]]:
+    """Yield `count` Hostaway review payloads submitted over `days` days from 2022-01-01"""
+    rng = random.Random(seed)
+    listing_pool = listings(properties)
+    weights = [CHANNEL_WEIGHTS[CHANNELS.index(c)] if c in CHANNELS else 1 for c in channels]
+    step = days * 86400 / max(count, 1)
+
+    for i in range(count):
+        listing = listing_pool[rng.randrange(properties)]
+        # Each listing has its own typical score
+        base = 7 + listing["listingMapId"] % 4
+        categories = [
+            {"category": category, "rating": max(1, min(10, base + rng.randint(-2, 1)))}
+            for category in CATEGORIES
+        ]
+        review: Dict[str, Any] = {
+            "id": first_id + i,
+            "type": "guest-to-host" if rng.random() < 0.9 else "host-to-guest",
+            "status": "published" if rng.random() < 0.95 else "awaiting",
+            # Most reviews only carry category ratings, as in the mock data
+            "rating": rng.randint(base - 2, 10) if rng.random() < 0.3 else None,
+            "publicReview": f"{rng.choice(OPENINGS)}, {rng.choice(DETAILS)} and {rng.choice(DETAILS)}.",
+            "reviewCategory": categories if rng.random() < 0.9 else [],
+            "submittedAt": (START + timedelta(seconds=int(i * step + rng.random() * step)))
+            .strftime("%Y-%m-%d %H:%M:%S"),
+            "guestName": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "listingName": listing["listingName"],
+            "listingMapId": listing["listingMapId"],
+            "channel": rng.choices(channels, weights)[0],
+        }
+        yield review
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.generator")
+    parser.add_argument("--reviews", type=int, default=10000)
+    parser.add_argument("--properties", type=int, default=50)
+    parser.add_argument("--channels", nargs="+", default=list(CHANNELS))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="File to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    # Written as a Hostaway response, one review at a time so 1M reviews fit in memory
+    out = open(args.out, "wb") if args.out else sys.stdout.buffer
+    try:
+        out.write(b'{"status":"success","result":[')
+        reviews = generate_reviews(args.reviews, args.properties, args.channels, args.seed)
+        for i, review in enumerate(reviews):
+            if i:
+                out.write(b",")
+            out.write(orjson.dumps(review))
+        out.write(b"]}\n")
+    finally:
+        if args.out:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Parity check and benchmark for review listing serialization.
+
+Builds SQLite fixtures of 10k and 100k reviews, then pages through each with
+the ORM path (full Review objects and listing names -> ReviewNormalized -> ReviewResponse JSON)
+and the lean path (LISTING_COLUMNS rows -> orjson, as GET /api/reviews does).
+Fails unless both paths produce identical bytes, then reports ms/page and
+rows/sec for each.
+
+Usage:
+    python -m bench.listing [--sizes 10000 100000] [--page-size 500] [--pages 50]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.database import create_engine as create_app_engine
+from app.models import Base
+from app.models.listing import Listing
+from app.models.review import Review
+from app.schemas.review import ReviewNormalized, ReviewResponse
+from app.services.listings import listing_key, listing_row
+from app.services.normalizer import normalize_reviews
+from app.services.review_queries import newest_first
+from app.services.review_serializer import dump_review_response, select_listing_rows
+from app.services.sync import ReviewSyncService
+from bench.normalize import build_dataset
+
+
+def build_fixture(path: str, rows: int) -> None:
+    """Create a SQLite database holding `rows` synced reviews"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    dataset = normalize_reviews(build_dataset(rows))
+    with engine.begin() as conn:
+        listings = {listing_key(listing_row(review)): listing_row(review) for review in dataset}
+        conn.execute(insert(Listing), list(listings.values()))
+        listing_ids = {
+            (account_id, external_id): listing_id
+            for listing_id, account_id, external_id in conn.execute(
+                select(Listing.id, Listing.account_id, Listing.external_id)
+            )
+        }
+        for start in range(0, rows, 5000):
+            batch = [
+                ReviewSyncService.to_row(review, listing_ids[listing_key(listing_row(review))])
+                for review in dataset[start : start + 5000]
+            ]
+            for i, row in enumerate(batch):
+                # Some approved/featured reviews so the booleans vary
+                row["is_approved"] = (start + i) % 3 == 0
+                row["is_featured"] = (start + i) % 11 == 0
+            conn.execute(insert(Review), batch)
+    engine.dispose()
+
+
+async def orm_page(db: AsyncSession, offset: int, limit: int) -> bytes:
+    """GET /api/reviews before the lean path: ORM objects and pydantic models"""
+    result = await db.execute(
+        newest_first(select(Review, Listing.name))
+        .outerjoin(Listing, Listing.id == Review.listing_ref_id)
+        .offset(offset)
+        .limit(limit)
+    )
+    normalized = []
+    for review, listing_name in result.all():
+        categories = review.review_categories or []
+        avg_rating = review.rating
+        if avg_rating is None and categories:
+            avg_rating = sum(cat["rating"] for cat in categories) / len(categories)
+        normalized.append(
+            ReviewNormalized(
+                id=str(review.external_id),
+                listing_id=review.listing_id,
+                listing_name=listing_name,
+                property_id=review.property_id,
+                review_type=review.review_type,
+                status=review.status,
+                rating=review.rating,
+                average_rating=avg_rating,
+                public_review=review.public_review,
+                review_categories=[
+                    {"category": cat["category"], "rating": cat["rating"]}
+                    for cat in categories
+                ],
+                guest_name=review.guest_name,
+                channel=review.channel,
+                submitted_at=review.submitted_at,
+                is_approved=review.is_approved,
+                is_featured=review.is_featured,
+            )
+        )
+    response = ReviewResponse(status="success", total=len(normalized), data=normalized)
+    return response.model_dump_json().encode()
+
+
+async def lean_page(db: AsyncSession, offset: int, limit: int) -> bytes:
+    """GET /api/reviews now: selected columns serialized with orjson"""
+    result = await db.execute(newest_first(select_listing_rows()).offset(offset).limit(limit))
+    return dump_review_response(result.all())
+
+
+PATHS: Dict[str, Callable[[AsyncSession, int, int], Awaitable[bytes]]] = {
+    "orm + pydantic": orm_page,
+    "lean columns + orjson": lean_page,
+}
+
+
+async def check_parity(sessions, rows: int, page_size: int) -> List[str]:
+    """Compare both paths on the first, a middle and the last page"""
+    problems = []
+    async with sessions() as db:
+        for offset in sorted({0, (rows // 2) // page_size * page_size, rows - page_size}):
+            # Byte-identical, so ETags are unchanged by the switch
+            orm = await orm_page(db, max(offset, 0), page_size)
+            lean = await lean_page(db, max(offset, 0), page_size)
+            if orm != lean:
+                problems.append(f"page at offset {offset} differs")
+    return problems
+
+
+async def run_size(rows: int, page_size: int, pages: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "listing.db")
+        build_fixture(path, rows)
+        # Same engine options (pool, pragmas, JSON decoding) as the application
+        engine = create_app_engine(f"sqlite+aiosqlite:///{path}")
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        try:
+            problems = await check_parity(sessions, rows, page_size)
+            for problem in problems:
+                print(problem)
+            if problems:
+                print(f"Parity check failed for {rows:,} rows")
+                return 1
+
+            # Spread the measured pages across the whole table
+            page_count = max(1, rows // page_size)
+            step = max(1, page_count // pages)
+            offsets = [i * page_size for i in range(0, page_count, step)][:pages]
+
+            print(f"{rows:,} rows, {len(offsets)} pages of {page_size}:")
+            for name, page in PATHS.items():
+                async with sessions() as db:
+                    await page(db, 0, page_size)  # Warm up
+                    started = time.perf_counter()
+                    for offset in offsets:
+                        await page(db, offset, page_size)
+                    elapsed = time.perf_counter() - started
+                per_page_ms = elapsed / len(offsets) * 1000
+                rows_per_sec = len(offsets) * page_size / elapsed
+                print(f"  {name:<24} {per_page_ms:>8.2f} ms/page {rows_per_sec:>12,.0f} rows/sec")
+        finally:
+            await engine.dispose()
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.listing")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    for rows in args.sizes:
+        status = asyncio.run(run_size(rows, args.page_size, args.pages))
+        if status:
+            return status
+    print("Parity check passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Parity check and throughput benchmark for the review normalizers.
+
+Compares HostawayService._normalize_review (reference, one pydantic model per
+review) against the batch normalizer in app.services.normalizer, fails if any
+output differs, then reports rows/sec for each path.
+
+Usage:
+    python -m bench.normalize [--rows 100000]
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List, Dict, Any
+
+from app.services.hostaway import HostawayService
+from app.services.normalizer import normalize_reviews, to_models
+
+
+def build_dataset(rows: int) -> List[Dict[str, Any]]:
+    """Expand the mock payload into `rows` reviews, covering the edge cases"""
+    templates = HostawayService()._get_mock_data()["result"]
+    start = datetime(2024, 1, 1)
+    dataset = []
+    for i in range(rows):
+        review = dict(templates[i % len(templates)])
+        review["id"] = 100000 + i
+        review["submittedAt"] = (start + timedelta(minutes=7 * i)).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+        variant = i % 7
+        if variant == 1:
+            review["rating"] = None
+        elif variant == 2:
+            review["rating"] = 8  # Integer rating from the API
+        elif variant == 3:
+            review.pop("reviewCategory", None)
+        elif variant == 4:
+            review["listingName"] = "Standalone Listing"
+        elif variant == 5:
+            review.pop("channel", None)
+        elif variant == 6:
+            review["listingMapId"] = 2000 + i % 5
+        dataset.append(review)
+    return dataset
+
+
+def check_parity(dataset: List[Dict[str, Any]]) -> List[str]:
+    """Return a description of every review where the two normalizers disagree"""
+    service = HostawayService()
+    fast_rows = normalize_reviews(dataset)
+    fast_models = to_models(fast_rows)
+
+    problems = []
+    for raw, row, model in zip(dataset, fast_rows, fast_models):
+        expected = service._normalize_review(raw).model_dump()
+        for label, actual in (("dict", row), ("model", model.model_dump())):
+            if expected != actual or any(
+                type(expected[k]) is not type(actual[k]) for k in expected
+            ):
+                problems.append(f"review {raw['id']} ({label}): {actual!r} != {expected!r}")
+    return problems
+
+
+def rate(func, dataset) -> float:
+    started = time.perf_counter()
+    func(dataset)
+    return len(dataset) / (time.perf_counter() - started)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.normalize")
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    problems = check_parity(build_dataset(min(args.rows, 5000)))
+    for problem in problems[:20]:
+        print(problem)
+    if problems:
+        print(f"Parity check failed: {len(problems)} mismatch(es)")
+        return 1
+    print("Parity check passed")
+
+    dataset = build_dataset(args.rows)
+    service = HostawayService()
+    results = {
+        "reference (pydantic per review)": rate(
+            lambda data: [service._normalize_review(r) for r in data], dataset
+        ),
+        "fast (dicts)": rate(normalize_reviews, dataset),
+        "fast (dicts + TypeAdapter)": rate(
+            lambda data: to_models(normalize_reviews(data)), dataset
+        ),
+    }
+    for name, rows_per_sec in results.items():
+        print(f"{name:<34} {rows_per_sec:>12,.0f} rows/sec")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+"""
+Database-scale benchmark of the sync path and the read endpoints.
+
+For each database and size, loads generated reviews (bench.generator)
+through ReviewSyncService, re-syncs them unchanged and with edits, rebuilds
+the rollups and feeds, then times the read endpoints through the ASGI app
+with the response cache disabled, so every request reaches the database.
+Results go to a JSON file; --compare reports the change in median time
+(and in rows/sec for the syncs) against an earlier file and fails on
+regressions, and --min-rows-per-sec fails any sync slower than that floor.
+
+SQLite runs in a temporary file. A PostgreSQL URL must point at a scratch
+database: its tables are dropped and recreated.
+
+Usage:
+    python -m bench.suite [--sizes 10000 100000] [--databases sqlite postgresql+asyncpg://localhost/bench]
+                          [--properties 50] [--repeat 20] [--output bench-results.json]
+                          [--compare previous.json] [--threshold 0.2] [--min-rows-per-sec 2000]
+"""
+import argparse
+import asyncio
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+import orjson
+import sqlalchemy
+from sqlalchemy import select, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.cache import response_cache
+from app.db import get_db, get_read_db
+from app.db.database import create_engine
+from app.db.migrations import run_migrations, schema_migrations
+from app.main import app
+from app.models import Base
+from app.models.review import Review
+from app.services.normalizer import normalize_reviews
+from app.services.public_feed import PublicFeedService
+from app.services.stats import StatsService
+from app.services.sync import ReviewSyncService
+from bench.generator import generate_reviews
+
+# Reviews per normalized page fed to the sync, as Hostaway pages arrive
+PAGE_SIZE = 1000
+# Every Nth review is edited for the "sync (edits)" run
+EDIT_EVERY = 50
+
+
+def endpoints(property_id: str) -> Dict[str, str]:
+    """Benchmark name -> request path"""
+    return {
+        "GET /api/reviews (first page)": "/api/reviews/?limit=100",
+        "GET /api/reviews (property, min_rating)": (
+            f"/api/reviews/?property_id={property_id}&min_rating=8&limit=100"
+        ),
+        "GET /api/reviews (rating sort, total)": (
+            "/api/reviews/?sort=rating_desc&include_total=true&limit=100"
+        ),
+        "GET /api/reviews (search)": "/api/reviews/?q=heating&limit=100",
+        "GET /api/reviews/stats/dashboard": "/api/reviews/stats/dashboard",
+        "GET /api/reviews/stats/categories": "/api/reviews/stats/categories",
+        "GET /api/reviews/stats/timeseries": "/api/reviews/stats/timeseries?interval=week",
+        "GET /api/reviews/public/{property_id}": f"/api/reviews/public/{property_id}",
+    }
+
+
+async def normalized_pages(
+    size: int, properties: int, edited: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    """Generated reviews normalized a page at a time, as HostawayService yields them"""
+    page: List[Dict[str, Any]] = []
+    for review in generate_reviews(size, properties):
+        if edited and review["id"] % EDIT_EVERY == 0:
+            review["publicReview"] += " Edited after the stay."
+        page.append(review)
+        if len(page) >= PAGE_SIZE:
+            for row in normalize_reviews(page):
+                yield row
+            page = []
+    for row in normalize_reviews(page):
+        yield row
+
+
+async def reset_schema(engine: AsyncEngine) -> None:
+    """Drop and recreate every table, then apply the migrations"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(lambda sync_conn: schema_migrations.drop(sync_conn, checkfirst=True))
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
+
+
+def timing(name: str, samples: List[float], **extra: Any) -> Dict[str, Any]:
+    samples = sorted(samples)
+    return {
+        "benchmark": name,
+        "runs": len(samples),
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(samples[max(0, int(len(samples) * 0.95 + 0.5) - 1)] * 1000, 3),
+        "min_ms": round(samples[0] * 1000, 3),
+        **extra,
+    }
+
+
+async def bench_writes(sessions, size: int, properties: int) -> List[Dict[str, Any]]:
+    """Initial load, unchanged and edited re-syncs, and the rebuilds"""
+    results = []
+    runs = (
+        ("sync (initial load)", dict(update_existing=False), False),
+        ("sync (unchanged)", dict(update_existing=True), False),
+        ("sync (edits)", dict(update_existing=True), True),
+    )
+    for name, options, edited in runs:
+        async with sessions() as db:
+            started = time.perf_counter()
+            outcome = await ReviewSyncService(db, **options).sync(
+                normalized_pages(size, properties, edited)
+            )
+            elapsed = time.perf_counter() - started
+        results.append(
+            timing(
+                name,
+                [elapsed],
+                rows_per_sec=round(size / elapsed),
+                inserted=outcome.inserted,
+                updated=outcome.updated,
+            )
+        )
+        print(f"  {name:<40} {elapsed:>9.2f} s {size / elapsed:>12,.0f} rows/sec")
+
+    async with sessions() as db:
+        # Approve and feature some reviews so the approved filters and feeds have data
+        await db.execute(update(Review).where(Review.id % 3 == 0).values(is_approved=True))
+        await db.execute(update(Review).where(Review.id % 30 == 0).values(is_featured=True))
+        await db.commit()
+
+        for name, rebuild in (
+            ("rebuild stats", StatsService(db).rebuild),
+            ("rebuild public feeds", PublicFeedService(db).rebuild),
+        ):
+            started = time.perf_counter()
+            await rebuild()
+            elapsed = time.perf_counter() - started
+            results.append(timing(name, [elapsed]))
+            print(f"  {name:<40} {elapsed:>9.2f} s")
+    return results
+
+
+async def bench_endpoints(sessions, property_id: str, repeat: int) -> List[Dict[str, Any]]:
+    """Median/p95 latency of each read endpoint, served by the app against `sessions`"""
+
+    async def override():
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override
+    app.dependency_overrides[get_read_db] = override
+    # Measure the database path, not cache hits
+    backend, response_cache.backend = response_cache.backend, None
+
+    results = []
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, path in endpoints(property_id).items():
+                response = await client.get(path)  # Warm up
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path} returned {response.status_code}: {response.text}")
+                samples = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    await client.get(path)
+                    samples.append(time.perf_counter() - started)
+                result = timing(name, samples, response_bytes=len(response.content))
+                results.append(result)
+                print(
+                    f"  {name:<40} {result['median_ms']:>9.2f} ms median "
+                    f"{result['p95_ms']:>9.2f} ms p95"
+                )
+    finally:
+        response_cache.backend = backend
+        app.dependency_overrides.clear()
+    return results
+
+
+async def run_database(url: str, sizes: List[int], properties: int, repeat: int):
+    """All benchmarks for one database, returns (dialect name, results)"""
+    results = []
+    dialect = make_url(url).get_backend_name() if url != "sqlite" else "sqlite"
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(
+                f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}" if url == "sqlite" else url
+            )
+            sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            try:
+                await reset_schema(engine)
+                print(f"{dialect}, {size:,} reviews:")
+                rows = await bench_writes(sessions, size, properties)
+                async with sessions() as db:
+                    # Busiest property, for the filtered listing and the public feed
+                    property_id = await db.scalar(
+                        select(Review.property_id)
+                        .group_by(Review.property_id)
+                        .order_by(sqlalchemy.func.count().desc())
+                        .limit(1)
+                    )
+                rows += await bench_endpoints(sessions, property_id, repeat)
+            finally:
+                await engine.dispose()
+        results += [{"database": dialect, "size": size, **row} for row in rows]
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def result_key(result: Dict[str, Any]) -> Tuple[str, int, str]:
+    return result["database"], result["size"], result["benchmark"]
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any], threshold: float) -> int:
+    """Print the change in median time per benchmark, returns the number of regressions"""
+    before = {result_key(result): result for result in previous["results"]}
+    print(f"Compared with {previous.get('commit') or previous.get('created_at')}:")
+    regressions = 0
+    for result in current["results"]:
+        old = before.get(result_key(result))
+        if old is None or not old["median_ms"]:
+            continue
+        database, size, name = result_key(result)
+        if "rows_per_sec" in result and old.get("rows_per_sec"):
+            # Syncs gate on throughput: a drop beyond the threshold is a regression
+            change = result["rows_per_sec"] / old["rows_per_sec"] - 1
+            regressed = change < -threshold
+            figures = f"{old['rows_per_sec']:>10,} -> {result['rows_per_sec']:>10,} rows/s"
+        else:
+            change = result["median_ms"] / old["median_ms"] - 1
+            regressed = change > threshold
+            figures = f"{old['median_ms']:>10.2f} -> {result['median_ms']:>10.2f} ms"
+        regressions += regressed
+        print(
+            f"  {database:<10} {size:>9,} {name:<40} {figures} "
+            f"{change:>+7.1%}{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def below_floor(results: List[Dict[str, Any]], min_rows_per_sec: float) -> int:
+    """Print the syncs slower than `min_rows_per_sec`, returns how many there are"""
+    slow = [
+        result
+        for result in results
+        if "rows_per_sec" in result and result["rows_per_sec"] < min_rows_per_sec
+    ]
+    for result in slow:
+        database, size, name = result_key(result)
+        print(
+            f"  {database:<10} {size:>9,} {name:<40} {result['rows_per_sec']:>10,} rows/s "
+            f"below {min_rows_per_sec:,.0f}"
+        )
+    return len(slow)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument(
+        "--databases",
+        nargs="+",
+        default=["sqlite"],
+        help='"sqlite" (temporary file) and/or async URLs of scratch databases',
+    )
+    parser.add_argument("--properties", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20, help="Timed requests per endpoint")
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Slowdown reported as a regression (0.2 = 20%%)"
+    )
+    parser.add_argument(
+        "--min-rows-per-sec",
+        type=float,
+        help="Fail if any sync run is slower than this many rows per second",
+    )
+    args = parser.parse_args(argv)
+
+    previous = None
+    if args.compare:
+        # Read first: --compare and --output may be the same file
+        with open(args.compare, "rb") as f:
+            previous = orjson.loads(f.read())
+
+    results = []
+    for url in args.databases:
+        results += asyncio.run(run_database(url, args.sizes, args.properties, args.repeat))
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "properties": args.properties,
+        "results": results,
+    }
+    with open(args.output, "wb") as f:
+        f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+    print(f"Results written to {args.output}")
+
+    failed = False
+    if previous is not None:
+        regressions = compare(previous, report, args.threshold)
+        if regressions:
+            print(f"{regressions} benchmark(s) slower by more than {args.threshold:.0%}")
+            failed = True
+    if args.min_rows_per_sec is not None:
+        slow = below_floor(results, args.min_rows_per_sec)
+        if slow:
+            print(f"{slow} sync(s) below {args.min_rows_per_sec:,.0f} rows/sec")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Shared fixtures: a throwaway SQLite database per test and a fake Hostaway API.
+
+Async tests run on the anyio pytest plugin (installed with httpx/starlette).
+"""
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Settings are read at import time; keep tests away from real credentials and databases
+os.environ.setdefault("HOSTAWAY_API_KEY", "test")
+os.environ.setdefault("HOSTAWAY_ACCOUNT_ID", "1")
+os.environ.setdefault("ENVIRONMENT", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("HOSTAWAY_RETRY_BACKOFF", "0")
+
+import httpx
+import orjson
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.database import create_engine
+from app.models.hostaway_account import HostawayAccount
+from app.services.hostaway import HostawayService
+from bench.suite import reset_schema
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    await reset_schema(engine)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def sessions(engine) -> async_sessionmaker:
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def make_review(
+    review_id: int,
+    categories: List[Tuple[str, float]],
+    rating: Optional[float] = None,
+    listing_name: str = "1B N1 A - 29 Shoreditch Heights",
+    day: int = 1,
+) -> Dict[str, Any]:
+    """One review as returned by the Hostaway API"""
+    return {
+        "id": review_id,
+        "type": "guest-to-host",
+        "status": "published",
+        "rating": rating,
+        "publicReview": f"Review {review_id}",
+        "reviewCategory": [{"category": name, "rating": value} for name, value in categories],
+        "submittedAt": f"2024-01-{day:02d} 10:00:00",
+        "guestName": "Guest",
+        "listingName": listing_name,
+        "listingMapId": 1000,
+        "channel": "Airbnb",
+    }
+
+
+class FakeHostaway:
+    """Serves `reviews` with limit/offset paging; `failures` maps offsets to error statuses"""
+
+    def __init__(self, reviews: List[Dict[str, Any]]):
+        self.reviews = reviews
+        self.failures: Dict[int, List[int]] = {}
+        self.requested_offsets: List[int] = []
+        self.authorizations: Set[str] = set()
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        offset = int(request.url.params.get("offset", 0))
+        limit = int(request.url.params.get("limit", len(self.reviews)))
+        self.requested_offsets.append(offset)
+        self.authorizations.add(request.headers["Authorization"])
+        statuses = self.failures.get(offset)
+        if statuses:
+            return httpx.Response(statuses.pop(0), headers={"Retry-After": "0"})
+        body = {
+            "status": "success",
+            "count": len(self.reviews),
+            "result": self.reviews[offset : offset + limit],
+        }
+        return httpx.Response(200, content=orjson.dumps(body))
+
+    def service(self, page_size: Optional[int] = None) -> HostawayService:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        account = HostawayAccount(account_id="1", api_key="test", rate_limit_per_second=0)
+        service = HostawayService(client, account)
+        if page_size is not None:
+            service.page_size = page_size
+        return service
+
+
+@pytest.fixture
+def hostaway() -> FakeHostaway:
+    return FakeHostaway([make_review(i, [("cleanliness", 8), ("value", 6)]) for i in range(1, 7)])
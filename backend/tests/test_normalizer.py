@@ -0,0 +1,38 @@
+"""The batch normalizer must match HostawayService._normalize_review exactly"""
+import pytest
+
+from app.services.hostaway import HostawayService
+from app.services.normalizer import normalize_reviews
+from bench.normalize import build_dataset, check_parity
+from tests.conftest import make_review
+
+
+def test_parity_with_reference_normalizer():
+    # Seven variants per template: missing/integer ratings, no categories, no channel, ...
+    assert check_parity(build_dataset(1000)) == []
+
+
+def test_parity_on_mock_data():
+    assert check_parity(HostawayService()._get_mock_data()["result"]) == []
+
+
+@pytest.mark.parametrize(
+    "review",
+    [
+        make_review(1, [("cleanliness", 10), ("value", 7)]),
+        make_review(2, [], rating=4),
+        make_review(3, [], listing_name="No Separator"),
+        {"id": 4, "submittedAt": "2024-02-29 23:59:59"},
+    ],
+)
+def test_parity_on_edge_cases(review):
+    assert check_parity([review]) == []
+
+
+def test_category_average_without_rating():
+    (row,) = normalize_reviews([make_review(1, [("cleanliness", 10), ("value", 7)])])
+
+    assert row["rating"] is None
+    assert row["average_rating"] == 8.5
+    assert row["property_id"] == "1B N1 A"
+    assert row["listing_id"] == "1000"
@@ -0,0 +1,50 @@
+"""
+The hot review queries must keep using their composite indexes.
+
+Runs against SQLite always, and against PostgreSQL too when TEST_POSTGRESQL_URL
+points at a scratch database (its tables are dropped).
+"""
+import os
+
+import pytest
+from sqlalchemy import text
+
+from app.db.database import create_engine
+from app.db.query_plans import check_query_plans
+from bench.suite import reset_schema
+
+pytestmark = pytest.mark.anyio
+
+
+async def plan_problems(engine):
+    async with engine.begin() as conn:
+        problems = await conn.run_sync(check_query_plans)
+        await conn.rollback()
+    return problems
+
+
+async def test_sqlite_plans(engine):
+    assert await plan_problems(engine) == []
+
+
+async def test_missing_index_is_reported(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP INDEX ix_reviews_channel_submitted_at"))
+
+    problems = await plan_problems(engine)
+
+    assert problems
+    assert all(problem.startswith("reviews by channel:") for problem in problems)
+
+
+@pytest.mark.skipif(
+    not os.environ.get("TEST_POSTGRESQL_URL"), reason="TEST_POSTGRESQL_URL not set"
+)
+async def test_postgresql_plans():
+    engine = create_engine(os.environ["TEST_POSTGRESQL_URL"])
+    try:
+        await reset_schema(engine)
+        assert await plan_problems(engine) == []
+    finally:
+        await engine.dispose()
+
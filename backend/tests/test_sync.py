@@ -0,0 +1,120 @@
+"""Syncing from a fake Hostaway API into SQLite, checked against the rollups"""
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.models.review import Review
+from app.models.review_category_rating import ReviewCategoryRating
+from app.services.daily_stats import DailyStatsService
+from app.services.stats import StatsService
+from app.services.sync import ReviewSyncService
+from tests.conftest import make_review
+
+pytestmark = pytest.mark.anyio
+
+
+async def sync(sessions, hostaway, **kwargs):
+    async with sessions() as db:
+        return await ReviewSyncService(db).sync_from_hostaway(hostaway.service(**kwargs), "full")
+
+
+async def assert_consistent(sessions):
+    async with sessions() as db:
+        assert await StatsService(db).check_consistency() == []
+        assert await DailyStatsService(db).check_consistency() == []
+
+
+async def test_initial_sync(sessions, hostaway):
+    result = await sync(sessions, hostaway)
+
+    assert (result.inserted, result.updated, result.deleted) == (6, 0, 0)
+    await assert_consistent(sessions)
+
+
+async def test_category_edits(sessions, hostaway):
+    await sync(sessions, hostaway)
+    hostaway.reviews[2] = make_review(3, [("cleanliness", 2), ("value", 4)])
+    hostaway.reviews[4] = make_review(5, [("cleanliness", 9), ("location", 10)], rating=9)
+    hostaway.reviews[5] = make_review(6, [("cleanliness", 9)])
+
+    result = await sync(sessions, hostaway)
+
+    assert (result.inserted, result.updated) == (0, 3)
+    async with sessions() as db:
+        reviews = {
+            review.external_id: review for review in (await db.scalars(select(Review))).all()
+        }
+        children = (
+            await db.execute(
+                select(
+                    Review.external_id, ReviewCategoryRating.category, ReviewCategoryRating.rating
+                )
+                .join(ReviewCategoryRating, ReviewCategoryRating.review_id == Review.id)
+                .where(Review.external_id.in_(["3", "5", "6"]))
+            )
+        ).all()
+    assert reviews["3"].average_rating == 3
+    assert reviews["5"].average_rating == 9
+    assert (reviews["6"].category_count, reviews["6"].average_rating) == (1, 9)
+    assert sorted(children) == [
+        ("3", "cleanliness", 2),
+        ("3", "value", 4),
+        ("5", "cleanliness", 9),
+        ("5", "location", 10),
+        ("6", "cleanliness", 9),
+    ]
+    await assert_consistent(sessions)
+
+
+async def test_consistency_check_detects_corruption(sessions, hostaway):
+    await sync(sessions, hostaway)
+
+    async with sessions() as db:
+        await db.execute(
+            Review.__table__.update().where(Review.external_id == "1").values(category_count=5)
+        )
+        assert await StatsService(db).check_consistency() != []
+
+
+async def test_deleted_reviews(sessions, hostaway):
+    await sync(sessions, hostaway)
+    del hostaway.reviews[:2]
+
+    result = await sync(sessions, hostaway)
+
+    assert result.deleted == 2
+    await assert_consistent(sessions)
+
+
+async def test_listing_move(sessions, hostaway):
+    await sync(sessions, hostaway)
+    for review in hostaway.reviews:
+        review["listingName"] = "2B N1 B - 10 Other Street"
+
+    await sync(sessions, hostaway)
+
+    async with sessions() as db:
+        property_ids = set((await db.scalars(select(Review.property_id))).all())
+    assert len(property_ids) == 1
+    await assert_consistent(sessions)
+
+
+async def test_paging_with_retries(sessions, hostaway):
+    hostaway.reviews = [make_review(i, [("cleanliness", 8)], day=i % 28 + 1) for i in range(1, 24)]
+    hostaway.failures = {5: [429], 10: [503, 502]}
+
+    result = await sync(sessions, hostaway, page_size=5)
+
+    assert result.inserted == 23
+    assert sorted(set(hostaway.requested_offsets)) == [0, 5, 10, 15, 20]
+    assert hostaway.requested_offsets.count(10) == 3
+    assert hostaway.authorizations == {"Bearer test"}
+    await assert_consistent(sessions)
+
+
+async def test_unretried_errors_fail_the_sync(sessions, hostaway):
+    hostaway.reviews = [make_review(i, [("cleanliness", 8)]) for i in range(1, 12)]
+    hostaway.failures = {5: [500] * 10}
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await sync(sessions, hostaway, page_size=5)